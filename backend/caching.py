@@ -1,52 +1,431 @@
+import os
+import sys
+import pickle
+import hashlib
 import time
+import threading
+from collections import OrderedDict
 from functools import wraps
 import logging
 
+import numpy as np
+import pandas as pd
+
+from backend import disk_cache
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Simple in-memory cache dictionary
-# Structure: {key: {'data': value, 'expiry': timestamp}}
-_CACHE = {}
+# Cache limits. A loaded FastF1 session with telemetry is easily a few hundred MB,
+# so the byte budget is what keeps the container from being OOM-killed.
+CACHE_MAX_ENTRIES = int(os.environ.get("F1DASH_CACHE_MAX_ENTRIES", "256"))
+CACHE_MAX_BYTES = int(os.environ.get("F1DASH_CACHE_MAX_MB", "1024")) * 1024 * 1024
+CACHE_SWEEP_INTERVAL = int(os.environ.get("F1DASH_CACHE_SWEEP_SECONDS", "60"))
+
+# Sentinel returned by LRUCache.get on a miss (None is a valid cached value)
+_MISSING = object()
+
+
+class _InFlightCall:
+    """A load in progress for one key; concurrent callers wait on it instead of loading again."""
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
 
-def ttl_cache(ttl_seconds=300):
+
+def estimate_size(obj, _seen=None, _depth=0):
+    """
+    Best-effort estimate of the memory held by a cached value, in bytes.
+    DataFrames are measured with memory_usage(deep=True); objects that grow after
+    being cached (e.g. a LazySession) report their size through cache_size();
+    other containers and plain objects are walked a few levels deep.
+    """
+    if _seen is None:
+        _seen = set()
+    if id(obj) in _seen:
+        return 0
+    _seen.add(id(obj))
+
+    if callable(getattr(type(obj), 'cache_size', None)):
+        return int(obj.cache_size())
+
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(deep=True).sum())
+    if isinstance(obj, (pd.Series, pd.Index)):
+        return int(obj.memory_usage(deep=True))
+    if isinstance(obj, np.ndarray):
+        return int(obj.nbytes)
+    if isinstance(obj, (str, bytes, int, float, bool)) or obj is None:
+        return sys.getsizeof(obj)
+    if _depth >= 4:
+        return sys.getsizeof(obj)
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        for k, v in obj.items():
+            size += estimate_size(k, _seen, _depth + 1) + estimate_size(v, _seen, _depth + 1)
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        for item in obj:
+            size += estimate_size(item, _seen, _depth + 1)
+    elif hasattr(obj, '__dict__'):
+        size += estimate_size(vars(obj), _seen, _depth + 1)
+    return size
+
+
+class LRUCache:
+    """
+    Bounded in-memory cache with per-entry TTL, LRU eviction and a byte budget.
+    Expired entries are removed on access and by a background sweeper thread,
+    which also re-measures entries that load more data after being cached.
+    """
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES, max_bytes=CACHE_MAX_BYTES,
+                 sweep_interval=CACHE_SWEEP_INTERVAL):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sweep_interval = sweep_interval
+
+        # Structure: {key: {'data': value, 'created': timestamp, 'fresh_until': timestamp,
+        #                   'expiry': timestamp, 'size': bytes}}
+        # Ordered from least to most recently used.
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+        self._total_bytes = 0
+        self._sweeper = None
+        self._stop_event = threading.Event()
+
+        # Loads currently running, keyed like _entries: {key: _InFlightCall}
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+
+    def get(self, key, default=_MISSING):
+        """Returns the cached value for key, or default if missing or expired."""
+        entry = self._get_entry(key)
+        return default if entry is None else entry['data']
+
+    def set(self, key, value, ttl_seconds, stale_ttl_seconds=0):
+        """
+        Stores value under key, evicting least recently used entries if over budget.
+        The entry is fresh for ttl_seconds and may then be served stale for another
+        stale_ttl_seconds (the hard expiry) while it is refreshed in the background.
+        """
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            logger.warning(f"Not caching {key}: {size / 1e6:.1f} MB exceeds the cache budget.")
+            return
+
+        now = time.time()
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = {
+                'data': value,
+                'created': now,
+                'fresh_until': now + ttl_seconds,
+                'expiry': now + ttl_seconds + stale_ttl_seconds,
+                'size': size
+            }
+            self._total_bytes += size
+            self._evict()
+        self._ensure_sweeper()
+
+    def age(self, key):
+        """Seconds since the value under key was loaded, or None if it isn't cached."""
+        entry = self._get_entry(key)
+        return None if entry is None else time.time() - entry['created']
+
+    def get_or_load(self, key, loader, ttl_seconds, stale_ttl_seconds=0):
+        """
+        Returns the cached value for key, calling loader() on a miss.
+        Concurrent misses on the same key are coalesced: one caller runs the loader
+        and the others wait for its result (or exception). Other keys are not blocked.
+        A stale entry is returned immediately and refreshed by one background thread.
+        """
+        entry = self._get_entry(key)
+        if entry is not None:
+            if time.time() < entry['fresh_until']:
+                logger.info(f"Cache HIT for {key}")
+            else:
+                logger.info(f"Cache STALE for {key}. Serving stale data while refreshing...")
+                self._refresh_in_background(key, loader, ttl_seconds, stale_ttl_seconds)
+            return entry['data']
+
+        with self._inflight_lock:
+            call = self._inflight.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = self._inflight[key] = _InFlightCall()
+
+        if not is_leader:
+            logger.info(f"Cache MISS for {key}. Waiting for in-flight load...")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        # Another leader may have finished between our miss and registering the call
+        result = self.get(key)
+        if result is not _MISSING:
+            self._finish_call(key, call, result=result)
+            return result
+
+        logger.info(f"Cache MISS for {key}. Fetching data...")
+        return self._run_call(key, call, loader, ttl_seconds, stale_ttl_seconds)
+
+    def _run_call(self, key, call, loader, ttl_seconds, stale_ttl_seconds, keep_stale=False):
+        try:
+            result = loader()
+        except BaseException as e:
+            self._finish_call(key, call, error=e)
+            raise
+
+        # A background refresh that produced nothing keeps the stale data instead
+        if not (keep_stale and result is None):
+            self.set(key, result, ttl_seconds, stale_ttl_seconds)
+        self._finish_call(key, call, result=result)
+        return result
+
+    def _finish_call(self, key, call, result=None, error=None):
+        call.result = result
+        call.error = error
+        with self._inflight_lock:
+            del self._inflight[key]
+        call.done.set()
+
+    def _refresh_in_background(self, key, loader, ttl_seconds, stale_ttl_seconds):
+        with self._inflight_lock:
+            if key in self._inflight:
+                return
+            call = self._inflight[key] = _InFlightCall()
+
+        def refresh():
+            try:
+                self._run_call(key, call, loader, ttl_seconds, stale_ttl_seconds, keep_stale=True)
+                logger.info(f"Cache REFRESHED {key}")
+            except Exception as e:
+                logger.error(f"Background refresh failed for {key}: {e}")
+
+        threading.Thread(target=refresh, name="cache-refresh", daemon=True).start()
+
+    def delete(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def sweep(self):
+        """
+        Removes all expired entries and re-measures the ones that report their own
+        size (see estimate_size), evicting if they grew past the budget.
+        Returns the number of expired entries removed.
+        """
+        now = time.time()
+        with self._lock:
+            expired = [k for k, e in self._entries.items() if now >= e['expiry']]
+            for key in expired:
+                self._remove(key)
+            growing = [(k, e) for k, e in self._entries.items()
+                       if callable(getattr(type(e['data']), 'cache_size', None))]
+        self._remeasure(growing)
+        if expired:
+            logger.info(f"Cache sweeper removed {len(expired)} expired entries.")
+        return len(expired)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._total_bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes
+            }
+
+    def stop(self):
+        """Stops the background sweeper thread."""
+        self._stop_event.set()
+
+    def __contains__(self, key):
+        return self.get(key) is not _MISSING
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _get_entry(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.time() >= entry['expiry']:
+                logger.info(f"Cache EXPIRED for {key}")
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def _remeasure(self, entries):
+        # Measured outside the lock so lookups never wait on it
+        sizes = [(key, entry, estimate_size(entry['data'])) for key, entry in entries]
+        with self._lock:
+            for key, entry, size in sizes:
+                # Skip entries replaced or removed in the meantime
+                if self._entries.get(key) is entry:
+                    self._total_bytes += size - entry['size']
+                    entry['size'] = size
+            self._evict()
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self._total_bytes -= entry['size']
+
+    def _evict(self):
+        while self._entries and (len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes):
+            key, entry = self._entries.popitem(last=False)
+            self._total_bytes -= entry['size']
+            logger.info(f"Cache EVICTED {key} ({entry['size'] / 1e6:.1f} MB)")
+
+    def _ensure_sweeper(self):
+        # Started lazily so importing this module never spawns threads
+        if self._sweeper is not None or self.sweep_interval <= 0:
+            return
+        with self._lock:
+            if self._sweeper is None:
+                self._sweeper = threading.Thread(target=self._sweep_loop, name="cache-sweeper", daemon=True)
+                self._sweeper.start()
+
+    def _sweep_loop(self):
+        while not self._stop_event.wait(self.sweep_interval):
+            try:
+                self.sweep()
+            except Exception as e:
+                logger.error(f"Cache sweeper error: {e}")
+
+
+# Shared in-memory cache used by all ttl_cache decorated functions
+_CACHE = LRUCache()
+
+# Fingerprint functions for argument types that are slow or unreliable to repr().
+# Structure: {type: callable(obj) -> hashable identity}
+_FINGERPRINTS = {}
+
+def register_fingerprint(cls, func):
+    """
+    Registers how instances of cls are identified in cache keys.
+    func(obj) must return a small hashable value, e.g. (year, round, session type, version).
+    """
+    _FINGERPRINTS[cls] = func
+
+def _digest(data):
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+class UncacheableArgument(TypeError):
+    """Raised by fingerprint() for arguments that have no content-based identity."""
+
+def fingerprint(obj):
+    """
+    Returns a cheap, hashable identity for a function argument.
+    Registered domain objects use their identity, pandas/NumPy objects a content
+    hash, and anything else its pickled content. Scalars carry their type, so
+    1, 1.0 and True are different keys. Raises UncacheableArgument for objects
+    that can only be identified by id(), which is reused after garbage collection.
+    """
+    if obj is None:
+        return None
+    if isinstance(obj, (str, int, float, bool, bytes)):
+        return (type(obj).__name__, obj)
+
+    for cls in type(obj).__mro__:
+        if cls in _FINGERPRINTS:
+            return (cls.__name__, _FINGERPRINTS[cls](obj))
+
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        try:
+            hashed = pd.util.hash_pandas_object(obj, index=True).to_numpy()
+            return (type(obj).__name__, obj.shape, _digest(hashed.tobytes()))
+        except TypeError:
+            # Unhashable cell values (e.g. lists); fall through to the pickled content
+            pass
+    elif isinstance(obj, np.ndarray):
+        return ('ndarray', obj.shape, str(obj.dtype), _digest(np.ascontiguousarray(obj).tobytes()))
+    elif isinstance(obj, (list, tuple)):
+        return (type(obj).__name__, tuple(fingerprint(item) for item in obj))
+    elif isinstance(obj, (set, frozenset)):
+        # Iteration order of sets varies between processes; sort for a stable key
+        return (type(obj).__name__, tuple(sorted((fingerprint(item) for item in obj), key=repr)))
+    elif isinstance(obj, dict):
+        return ('dict', tuple(sorted((repr(k), fingerprint(v)) for k, v in obj.items())))
+
+    try:
+        return (type(obj).__qualname__, _digest(pickle.dumps(obj)))
+    except Exception as e:
+        raise UncacheableArgument(f"can't fingerprint {type(obj).__qualname__}: {e}") from e
+
+def make_key(func, args, kwargs):
+    """Builds the cache key for a call to func."""
+    return (
+        func.__module__,
+        func.__qualname__,
+        tuple(fingerprint(a) for a in args),
+        tuple(sorted((k, fingerprint(v)) for k, v in kwargs.items()))
+    )
+
+def ttl_cache(ttl_seconds=300, persist=None, stale_ttl_seconds=0):
     """
     Decorator to cache function results for a specific TTL (Time To Live).
     Useful for API calls to FastF1 to avoid rate limiting and improve performance.
+    Thread-safe: Streamlit sessions missing the same key at once trigger only one call.
+
+    persist: optional namespace for the on-disk tier. DataFrame results are then also
+    written as Arrow files and reloaded from disk on a memory miss, so they survive restarts.
+    Only use it where the key fully determines the result (e.g. a versioned Session).
+
+    stale_ttl_seconds: stale-while-revalidate window. Once ttl_seconds has passed the old
+    value is still returned immediately while one background thread reloads it, until the
+    hard expiry (ttl_seconds + stale_ttl_seconds). The wrapped function gains a
+    data_age(*args, **kwargs) helper returning the age of the cached value in seconds.
     """
     def decorator(func):
         @wraps(func)
         def wrapper(*args, **kwargs):
-            # Create a unique key based on function name and arguments
-            key = f"{func.__name__}:{str(args)}:{str(kwargs)}"
-            
-            current_time = time.time()
-            
-            # Check if key exists and is valid
-            if key in _CACHE:
-                entry = _CACHE[key]
-                if current_time < entry['expiry']:
-                    logger.info(f"Cache HIT for {key}")
-                    return entry['data']
-                else:
-                    logger.info(f"Cache EXPIRED for {key}")
-                    del _CACHE[key]
-            
-            # Execute function and cache result
-            logger.info(f"Cache MISS for {key}. Fetching data...")
-            result = func(*args, **kwargs)
-            
-            _CACHE[key] = {
-                'data': result,
-                'expiry': current_time + ttl_seconds
-            }
-            return result
+            # Create a unique key based on function identity and argument fingerprints
+            try:
+                key = make_key(func, args, kwargs)
+            except UncacheableArgument as e:
+                logger.warning(f"Not caching {func.__qualname__}: {e}")
+                return func(*args, **kwargs)
+
+            def load():
+                if persist:
+                    stored = disk_cache.read_table(persist, key)
+                    if stored is not None:
+                        return stored
+                result = func(*args, **kwargs)
+                if persist and isinstance(result, pd.DataFrame):
+                    disk_cache.write_table(persist, key, result)
+                return result
+
+            # Execute function on a miss; concurrent callers share a single load
+            return _CACHE.get_or_load(key, load, ttl_seconds, stale_ttl_seconds)
+
+        def data_age(*args, **kwargs):
+            try:
+                return _CACHE.age(make_key(func, args, kwargs))
+            except UncacheableArgument:
+                return None
+
+        wrapper.data_age = data_age
         return wrapper
     return decorator
 
 def clear_cache():
     """Clears the entire in-memory cache."""
-    global _CACHE
     _CACHE.clear()
     logger.info("Cache cleared.")
+
+def cache_stats():
+    """Returns entry count and byte usage of the in-memory cache."""
+    return _CACHE.stats()
@@ -1,23 +1,61 @@
 import fastf1
 import pandas as pd
 import numpy as np
+import os
 import logging
+import threading
 from datetime import datetime
-from backend.caching import ttl_cache
+from backend.caching import ttl_cache, register_fingerprint
+from backend.lazy_session import LazySession, session_identity
+from backend.downsampling import build_resolution_levels
+from backend.telemetry import compact_telemetry, resample_to_grid, summarize_laps
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Enable FastF1 cache (filesystem cache for persistence across restarts if needed, 
-# but we rely on our memory cache for immediate speed)
-# fastf1.Cache.enable_cache('backend/cache') # Optional: Enable if we want FS caching
+# Enable FastF1 cache (filesystem cache for persistence across restarts).
+# Raw API responses land here, so a restarted container doesn't re-download the race.
+# Our memory cache sits on top for immediate speed and backend/cache/tables holds derived tables.
+FASTF1_CACHE_DIR = "backend/cache"
+try:
+    os.makedirs(FASTF1_CACHE_DIR, exist_ok=True)
+    fastf1.Cache.enable_cache(FASTF1_CACHE_DIR)
+except Exception as e:
+    logger.warning(f"Could not enable FastF1 cache: {e}")
 
-@ttl_cache(ttl_seconds=300) # Cache for 5 minutes
+register_fingerprint(fastf1.core.Session, session_identity)
+register_fingerprint(LazySession, session_identity)
+
+# The session being followed; reloads refresh it in place instead of starting over
+_ACTIVE_SESSION = {}
+
+def _open_session(year, round_num):
+    """
+    Returns the LazySession for a race, refreshing the one already open for it so
+    a reload only processes the laps completed since the last one.
+    """
+    key = (int(year), int(round_num))
+    session = _ACTIVE_SESSION.get(key)
+    if session is not None:
+        session.refresh()
+        return session
+
+    session = LazySession(fastf1.get_session(year, round_num, 'R')) # Load Race
+    session.results # Results first; the rest loads on demand
+    _ACTIVE_SESSION.clear()
+    _ACTIVE_SESSION[key] = session
+    return session
+
+# Cache for 5 minutes; after that the old session is served for up to 30 more minutes
+# while a background thread reloads it, so pages never block on a reload.
+@ttl_cache(ttl_seconds=300, stale_ttl_seconds=1800)
 def load_current_session():
     """
     Loads the current or latest F1 session.
     Tries to find a live session, otherwise falls back to the last completed session.
+    Only results and metadata are loaded here; the returned LazySession fetches laps,
+    weather and telemetry the first time a page uses them.
     """
     try:
         # Get current schedule
@@ -41,21 +79,21 @@ def load_current_session():
             
             logger.info(f"Loading data for {year} Round {round_num}: {event_name}")
             
-            session = fastf1.get_session(year, round_num, 'R') # Load Race
-            session.load(telemetry=True, laps=True, weather=True)
-            return session
+            return _open_session(year, round_num)
         else:
             # Fallback to previous year if early in season
             logger.warning("No events found for current year. Falling back to previous year.")
-            session = fastf1.get_session(year - 1, 22, 'R') # Abu Dhabi
-            session.load(telemetry=True, laps=True, weather=True)
-            return session
+            return _open_session(year - 1, 22) # Abu Dhabi
 
     except Exception as e:
         logger.error(f"Error loading session: {e}")
         # Ultimate fallback for demo stability
         return None
 
+def get_session_data_age():
+    """Seconds since the current session was loaded, or None if it isn't loaded yet."""
+    return load_current_session.data_age()
+
 def get_session_metadata(session):
     """Extracts metadata from the session object."""
     if not session:
@@ -71,10 +109,21 @@ def get_session_metadata(session):
         "humidity": session.weather_data['Humidity'].mean() if not session.weather_data.empty else "N/A",
     }
 
+# Leaderboard status codes (StatusCode column)
+STATUS_FINISHED = 0
+STATUS_LAPPED = 1
+STATUS_NOT_CLASSIFIED = 2
+
+@ttl_cache(ttl_seconds=300)
 def get_live_leaderboard(session):
     """
     Returns the current leaderboard.
     For a completed session, this returns the final classification.
+
+    Gaps are numeric (GapSeconds to the leader, IntervalSeconds to the car ahead;
+    NaN when not applicable) and StatusCode is one of the STATUS_* constants.
+    Formatting for display happens in components.leaderboard. The frame is cached
+    per session version and shared between pages, so callers must not modify it.
     """
     if not session:
         return pd.DataFrame()
@@ -83,37 +132,65 @@ def get_live_leaderboard(session):
     # We want: Position, Driver, Team, Time/Gap, Points
     try:
         results = session.results
-        leaderboard = results[['Position', 'Abbreviation', 'TeamName', 'Time', 'Status', 'Points']].copy()
-        leaderboard['Position'] = leaderboard['Position'].fillna(0).astype(int)
-        leaderboard = leaderboard.sort_values('Position')
-        
-        # Format Time: Time is a Timedelta, convert to string
-        # For winner, it's the time. For others, it's usually gap.
-        # FastF1 results 'Time' is total time for finisher.
-        # Let's calculate Gap to leader
-        winner_time = leaderboard.iloc[0]['Time']
-        leaderboard['Gap'] = leaderboard['Time'] - winner_time
-        leaderboard['Gap'] = leaderboard['Gap'].apply(lambda x: f"+{x.total_seconds():.3f}s" if pd.notnull(x) and x.total_seconds() > 0 else "Leader")
-        
-        # Handle non-finishers
-        mask_status = leaderboard['Status'] != 'Finished'
-        leaderboard.loc[mask_status, 'Gap'] = leaderboard.loc[mask_status, 'Status']
-        
+        position = results['Position']
+        status = results['Status'].fillna('').astype(str)
+
+        status_code = np.full(len(results), STATUS_NOT_CLASSIFIED, dtype=np.int8)
+        status_code[status.str.contains('Lap').to_numpy()] = STATUS_LAPPED
+        status_code[(status == 'Finished').to_numpy()] = STATUS_FINISHED
+
+        leaderboard = pd.DataFrame({
+            'Position': position.fillna(0).astype(np.int16).to_numpy(),
+            'Abbreviation': results['Abbreviation'].to_numpy(),
+            'TeamName': results['TeamName'].to_numpy(),
+            'Time': results['Time'].to_numpy(),
+            'Status': status.to_numpy(),
+            'StatusCode': status_code,
+            'Points': results['Points'].astype(np.float32).to_numpy()
+        })
+
+        # Classified drivers in order, unclassified (Position 0) at the bottom
+        order = np.lexsort((leaderboard['Position'].to_numpy(), leaderboard['Position'].to_numpy() == 0))
+        leaderboard = leaderboard.iloc[order].reset_index(drop=True)
+
+        # FastF1 results 'Time' is total time for finishers, so gaps are relative to the winner's time
+        finished = leaderboard['StatusCode'] == STATUS_FINISHED
+        winner_time = leaderboard['Time'].iloc[0]
+        gap = (leaderboard['Time'] - winner_time).dt.total_seconds()
+        leaderboard['GapSeconds'] = gap.where(finished)
+        leaderboard['IntervalSeconds'] = leaderboard['GapSeconds'].diff()
+
         return leaderboard
     except Exception as e:
         logger.error(f"Error generating leaderboard: {e}")
         return pd.DataFrame()
 
-@ttl_cache(ttl_seconds=60)
+def _resolve_lap_version(session):
+    """
+    Loads laps so the session's data_version is known. It's part of the cache key,
+    so lap-derived results must not be keyed (or persisted) before it's set.
+    """
+    if session:
+        session.laps
+    return session
+
 def get_car_telemetry(session, driver_code):
     """
     Fetches telemetry for a specific driver.
+    Returned in the compact layout from backend.telemetry (relative float32 Time,
+    Distance, Speed, RPM, Throttle, Brake, Gear).
     """
+    return _car_telemetry(_resolve_lap_version(session), driver_code)
+
+@ttl_cache(ttl_seconds=60, persist="telemetry_compact")
+def _car_telemetry(session, driver_code):
     if not session:
         return pd.DataFrame()
     
     try:
-        laps = session.laps.pick_driver(driver_code)
+        # Telemetry is only pulled from FastF1 when this driver's trace isn't cached yet
+        session.ensure_telemetry()
+        laps = get_driver_laps(session, driver_code)
         if laps.empty:
             return pd.DataFrame()
             
@@ -121,12 +198,167 @@ def get_car_telemetry(session, driver_code):
         fastest_lap = laps.pick_fastest()
         telemetry = fastest_lap.get_telemetry()
         
-        # Downsample for faster plotting if needed, but FastF1 is usually okay
-        return telemetry[['Date', 'Speed', 'Throttle', 'Brake', 'RPM', 'Gear', 'Distance']]
+        # Plotting uses the downsampled views from get_telemetry_levels
+        return compact_telemetry(telemetry)
     except Exception as e:
         logger.error(f"Error fetching telemetry for {driver_code}: {e}")
         return pd.DataFrame()
 
+def iter_lap_telemetry(session, driver_code, stint=None):
+    """
+    Yields (lap_number, compact telemetry) for every lap of a driver, or of one stint.
+    The session's telemetry for the whole field is loaded up front; only the
+    per-lap slices and their compact copies are made one at a time, so they
+    are never all held at once. Laps without car data are skipped.
+    """
+    if not session:
+        return
+
+    session.ensure_telemetry()
+    laps = get_driver_laps(session, driver_code)
+    if stint is not None:
+        laps = laps[laps['Stint'] == stint]
+
+    for _, lap in laps.iterlaps():
+        try:
+            car_data = lap.get_car_data().add_distance()
+        except Exception as e:
+            logger.warning(f"No telemetry for {driver_code} lap {lap['LapNumber']}: {e}")
+            continue
+        yield int(lap['LapNumber']), compact_telemetry(car_data)
+
+def get_lap_telemetry_summary(session, driver_code, stint=None):
+    """
+    Per-lap telemetry aggregates (max speed, full-throttle %, braking zones) for a
+    driver's whole race or one stint, computed while streaming the laps.
+    """
+    return _lap_telemetry_summary(_resolve_lap_version(session), driver_code, stint)
+
+@ttl_cache(ttl_seconds=300, persist="lap_summary")
+def _lap_telemetry_summary(session, driver_code, stint=None):
+    try:
+        return summarize_laps(iter_lap_telemetry(session, driver_code, stint=stint))
+    except Exception as e:
+        logger.error(f"Error summarizing telemetry for {driver_code}: {e}")
+        return pd.DataFrame()
+
+@ttl_cache(ttl_seconds=60)
+def get_telemetry_levels(session, driver_code):
+    """
+    Precomputed LTTB downsampling levels for a driver's telemetry trace,
+    cached alongside get_car_telemetry. Returns {n_points: row indices}.
+    """
+    return build_resolution_levels(get_car_telemetry(session, driver_code))
+
+@ttl_cache(ttl_seconds=60)
+def get_telemetry_comparison(session, driver_codes, n_points=1000):
+    """
+    Fastest-lap telemetry of several drivers on a common distance grid.
+    Returns {'drivers': [...], 'distance': grid, 'Speed'/'Throttle'/'Brake': 2-D arrays
+    (driver x distance)}; drivers without telemetry are left out.
+    """
+    drivers, traces = [], []
+    for code in driver_codes:
+        telemetry = get_car_telemetry(session, code)
+        if not telemetry.empty:
+            drivers.append(code)
+            traces.append(telemetry)
+
+    grid, channels = resample_to_grid(traces, n_points=n_points)
+    return {'drivers': drivers, 'distance': grid, **channels}
+
+# Derived lap tables of the current session: {(name, base identity): (data version, table)}.
+# Refreshes only process new laps; a different session replaces them.
+_INCREMENTAL = {}
+_INCREMENTAL_LOCK = threading.Lock()
+
+def incremental_table(name, session, build, update):
+    """
+    Returns a table derived from session.laps, kept up to date incrementally:
+    build(laps) makes it from scratch, update(table, new_laps, first_row) folds in
+    laps appended since (first_row is the position of new_laps[0] in session.laps).
+    """
+    if not hasattr(session, 'lap_delta'):
+        return build(session.laps)
+
+    key = (name, session.base_identity)
+    with _INCREMENTAL_LOCK:
+        previous = _INCREMENTAL.get(key)
+
+    version, first_row, laps = session.lap_delta(previous[0] if previous else None)
+    if previous is not None and previous[0] == version:
+        return previous[1]
+    if previous is not None and first_row > 0:
+        table = update(previous[1], laps, first_row)
+    else:
+        table = build(laps)
+
+    with _INCREMENTAL_LOCK:
+        stored = _INCREMENTAL.get(key)
+        if stored is None or stored[0] < version:
+            if stored is None:
+                # Only the session being followed is kept, like _ACTIVE_SESSION
+                for other in [k for k in _INCREMENTAL if k[1] != session.base_identity]:
+                    del _INCREMENTAL[other]
+            _INCREMENTAL[key] = (version, table)
+    return table
+
+def _build_lap_index(laps, first_row=0):
+    if laps.empty:
+        return {}
+    index = {driver: np.asarray(rows) + first_row for driver, rows in laps.groupby('Driver', sort=False).indices.items()}
+    numbers = laps.groupby('Driver', sort=False)['DriverNumber'].first()
+    for driver, number in numbers.items():
+        index[str(number)] = index[driver]
+    return index
+
+def _update_lap_index(index, new_laps, first_row):
+    added = _build_lap_index(new_laps, first_row)
+    index = dict(index)
+    for key, rows in added.items():
+        index[key] = np.concatenate([index[key], rows]) if key in index else rows
+    return index
+
+@ttl_cache(ttl_seconds=300)
+def get_lap_index(session):
+    """
+    Maps each driver to the row positions of their laps in session.laps.
+    Built in one groupby pass per session; later versions only index the laps
+    they added. Keys are both the driver abbreviation ('VER') and the driver
+    number ('1'), like Laps.pick_driver.
+    """
+    if not session:
+        return {}
+
+    if session.laps.empty:
+        return {}
+    return incremental_table('lap_index', session, _build_lap_index, _update_lap_index)
+
+def get_driver_laps(session, driver):
+    """Returns one driver's laps using the lap index instead of filtering the whole table."""
+    rows = get_lap_index(session).get(driver)
+    if rows is None:
+        return session.laps.iloc[0:0]
+    return session.laps.iloc[rows]
+
+def _last_lap_tyres(laps):
+    # Laps are ordered by lap number within each driver, so one pass picks every driver's last lap
+    last_laps = laps.groupby('Driver', sort=False).tail(1)
+    return pd.DataFrame({
+        'Driver': last_laps['Driver'].values,
+        'DriverNumber': last_laps['DriverNumber'].values,
+        'Compound': last_laps['Compound'].values,
+        'TyreLife': last_laps['TyreLife'].values,
+        'Stint': last_laps['Stint'].values
+    })
+
+def _update_tyres(tyres, new_laps, first_row):
+    # Only drivers who completed a lap since the last version change
+    latest = _last_lap_tyres(new_laps)
+    kept = tyres[~tyres['Driver'].isin(latest['Driver'])]
+    return pd.concat([kept, latest], ignore_index=True)
+
+@ttl_cache(ttl_seconds=300)
 def get_live_tyre_data(session):
     """
     Returns tyre compound and life for drivers.
@@ -137,20 +369,9 @@ def get_live_tyre_data(session):
     try:
         # Get the last lap info for each driver
         # We want to know what tyre they are ON currently (at end of session or current)
-        
-        driver_tyres = []
-        for driver in session.drivers:
-            laps = session.laps.pick_driver(driver)
-            if not laps.empty:
-                last_lap = laps.iloc[-1]
-                driver_tyres.append({
-                    'Driver': driver,
-                    'Compound': last_lap['Compound'],
-                    'TyreLife': last_lap['TyreLife'],
-                    'Stint': last_lap['Stint']
-                })
-        
-        return pd.DataFrame(driver_tyres)
+        if session.laps.empty:
+            return pd.DataFrame()
+        return incremental_table('tyres', session, _last_lap_tyres, _update_tyres)
     except Exception as e:
         logger.error(f"Error fetching tyre data: {e}")
         return pd.DataFrame()
@@ -0,0 +1,100 @@
+import os
+import hashlib
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# pyarrow is optional: without it the disk tier is simply disabled
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:
+    pa = None
+    feather = None
+    logger.warning("pyarrow not installed. Persistent table cache disabled.")
+
+# Tables are stored as uncompressed Arrow IPC (Feather v2) files so they can be memory-mapped.
+# Structure: {DISK_CACHE_DIR}/{namespace}/{key digest}.arrow
+DISK_CACHE_DIR = os.environ.get("F1DASH_DISK_CACHE_DIR", "backend/cache/tables")
+
+
+def is_enabled():
+    return feather is not None
+
+
+def key_digest(key):
+    """
+    Stable file name for a cache key. Keys must be built from plain values
+    (see caching.fingerprint) so the digest matches across processes.
+    """
+    return hashlib.blake2b(repr(key).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def table_path(namespace, key):
+    return os.path.join(DISK_CACHE_DIR, namespace, f"{key_digest(key)}.arrow")
+
+
+def has_table(namespace, key):
+    return is_enabled() and os.path.exists(table_path(namespace, key))
+
+
+def read_table(namespace, key):
+    """
+    Loads a persisted table with memory-mapping.
+    Returns None if the table is missing or unreadable.
+    """
+    if not is_enabled():
+        return None
+
+    path = table_path(namespace, key)
+    if not os.path.exists(path):
+        return None
+
+    try:
+        table = feather.read_table(path, memory_map=True)
+        logger.info(f"Disk cache HIT for {namespace}/{key}")
+        return table.to_pandas(split_blocks=True)
+    except Exception as e:
+        logger.warning(f"Discarding unreadable disk cache entry {path}: {e}")
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        return None
+
+
+def write_table(namespace, key, df):
+    """
+    Persists a DataFrame (index included). The file is written to a temporary
+    name first so readers never see a partial table. Returns True on success.
+    """
+    if not is_enabled() or df is None or df.empty:
+        return False
+
+    path = table_path(namespace, key)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        table = pa.Table.from_pandas(df, preserve_index=True)
+        feather.write_feather(table, tmp_path, compression="uncompressed")
+        os.replace(tmp_path, path)
+        return True
+    except Exception as e:
+        logger.warning(f"Could not persist {namespace}/{key}: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return False
+
+
+def clear_disk_cache(namespace=None):
+    """Removes persisted tables, either for one namespace or all of them."""
+    root = os.path.join(DISK_CACHE_DIR, namespace) if namespace else DISK_CACHE_DIR
+    if not os.path.isdir(root):
+        return
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            if name.endswith(".arrow"):
+                os.remove(os.path.join(dirpath, name))
+    logger.info(f"Disk cache cleared: {root}")
@@ -0,0 +1,98 @@
+import numpy as np
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Point budgets precomputed per telemetry trace; charts pick the one matching their width
+RESOLUTION_LEVELS = (500, 1000, 2000)
+
+# Channels whose shape must survive downsampling (brake/throttle spikes included)
+TELEMETRY_CHANNELS = ('Speed', 'Throttle', 'Brake')
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets downsampling.
+    Returns the sorted indices of n_out points of (x, y) that best preserve the
+    visual shape of the line, always keeping the first and last point.
+
+    Bucket boundaries, bucket averages and triangle areas are computed with NumPy;
+    only the walk from one bucket to the next (which depends on the point picked in
+    the previous bucket) is a Python loop, so cost is O(n) with n_out iterations.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    # Interior points are split into n_out - 2 buckets
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    starts, ends = edges[:-1], edges[1:]
+
+    # Average point of every bucket, used as the third triangle vertex
+    counts = ends - starts
+    avg_x = np.add.reduceat(x[1:n - 1], starts - 1) / counts
+    avg_y = np.add.reduceat(y[1:n - 1], starts - 1) / counts
+    next_x = np.append(avg_x[1:], x[-1])
+    next_y = np.append(avg_y[1:], y[-1])
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    for i in range(n_out - 2):
+        bx = x[starts[i]:ends[i]]
+        by = y[starts[i]:ends[i]]
+        # Twice the triangle area; the constant factor doesn't change the argmax
+        area = np.abs((x[a] - next_x[i]) * (by - y[a]) - (x[a] - bx) * (next_y[i] - y[a]))
+        a = starts[i] + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def downsample_indices(df, n_points, x='Distance', channels=TELEMETRY_CHANNELS):
+    """
+    Row indices keeping roughly n_points rows of a telemetry frame.
+    Each channel gets an equal share of the budget and the union is returned, so a
+    spike in any channel (e.g. a short brake application) is kept.
+    """
+    n = len(df)
+    channels = [c for c in channels if c in df.columns]
+    if n <= n_points or not channels:
+        return np.arange(n)
+
+    x_values = df[x].to_numpy(dtype=np.float64)
+    per_channel = max(3, n_points // len(channels))
+    picked = [lttb_indices(x_values, df[c].to_numpy(dtype=np.float64), per_channel) for c in channels]
+    return np.unique(np.concatenate(picked))
+
+
+def build_resolution_levels(df, levels=RESOLUTION_LEVELS, x='Distance'):
+    """
+    Precomputes downsampled row indices for each point budget in levels.
+    Returns {n_points: indices}; budgets at or above the row count are left out.
+    """
+    if df is None or df.empty or x not in df.columns:
+        return {}
+    return {level: downsample_indices(df, level, x=x) for level in levels if level < len(df)}
+
+
+def select_resolution(df, levels, max_points):
+    """
+    Returns the rows of df to plot: the largest precomputed level within max_points,
+    computed on the fly if no level fits, or df itself if it's already small enough.
+    """
+    if len(df) <= max_points:
+        return df
+    fitting = [level for level in (levels or {}) if level <= max_points]
+    if fitting:
+        return df.iloc[levels[max(fitting)]]
+    return df.iloc[downsample_indices(df, max_points)]
+
+
+def points_for_width(width_px, points_per_px=2, min_points=RESOLUTION_LEVELS[0], max_points=RESOLUTION_LEVELS[-1]):
+    """Point budget for a chart of the given width; more points than pixels can't be seen."""
+    return int(np.clip(width_px * points_per_px, min_points, max_points))
@@ -7,6 +7,15 @@ import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Model inputs of the pit stop model, in column order
+PIT_STOP_FEATURES = ['LapNumber', 'TireAge', 'Position', 'GapToLeader', 'TrackTemp', 'RollingLapTime']
+
+# Laps in the rolling lap-time mean
+PIT_ROLLING_WINDOW = 3
+
+# Used when a session has no weather data
+DEFAULT_TRACK_TEMP = 30.0
+
 class FeatureEngineer:
     """
     Handles feature engineering for F1 data.
@@ -15,39 +24,94 @@ class FeatureEngineer:
         self.scaler = StandardScaler()
         self.label_encoders = {}
         
-    def prepare_pit_stop_features(self, telemetry_data, weather_data, tire_data):
+    def prepare_pit_stop_features(self, lap_data, weather_data, window=PIT_ROLLING_WINDOW):
         """
         Prepares features for Pit Stop Prediction Model.
+        One row per driver and lap, built for the whole field in one vectorized pass.
         
         Features:
         - Tire Age
         - Lap Number
         - Position
-        - Gap to Leader
-        - Weather (Track Temp)
-        - Recent Lap Times (Rolling Mean)
+        - Gap to Leader (seconds behind the first car to complete the same lap)
+        - Weather (Track Temp, as of the end of the lap)
+        - Recent Lap Times (Rolling Mean over `window` laps)
+
+        Also returns Driver and the training label PitNextLap (the driver pits at
+        the end of the following lap).
         """
         try:
-            # Mock feature creation for demo purposes
-            # In a real scenario, we would merge these dataframes on 'Driver' and 'Lap'
-            
-            # Create a dummy dataframe if inputs are raw
-            df = pd.DataFrame()
-            
-            # Assume we have a merged dataset
-            # For now, we return a mock feature set
-            
-            # Example features
-            df['LapNumber'] = [10, 11, 12, 13, 14]
-            df['TireAge'] = [10, 11, 12, 13, 14]
-            df['Position'] = [1, 2, 3, 4, 5]
-            df['TrackTemp'] = [30.5] * 5
-            
-            return df
+            if lap_data is None or lap_data.empty:
+                return pd.DataFrame()
+
+            laps = pd.DataFrame({
+                'Driver': lap_data['Driver'].to_numpy(),
+                'LapNumber': lap_data['LapNumber'].to_numpy(dtype=float),
+                'Time': lap_data['Time'].to_numpy(),
+                'TireAge': lap_data['TyreLife'].to_numpy(dtype=float),
+                'Position': lap_data['Position'].to_numpy(dtype=float),
+                'LapTimeSeconds': lap_data['LapTime'].dt.total_seconds().to_numpy(),
+                'PitIn': lap_data['PitInTime'].notna().to_numpy()
+            })
+            laps = laps.sort_values(['Driver', 'LapNumber'], kind='stable').reset_index(drop=True)
+            by_driver = laps.groupby('Driver', sort=False)
+
+            # Gaps between cars on the same lap, measured where each car crossed the line
+            laps['GapToLeader'] = (laps['Time'] - laps.groupby('LapNumber')['Time'].transform('min')).dt.total_seconds()
+
+            laps['RollingLapTime'] = (
+                by_driver['LapTimeSeconds'].rolling(window, min_periods=1).mean()
+                .reset_index(level=0, drop=True)
+            )
+            laps['PitNextLap'] = by_driver['PitIn'].shift(-1, fill_value=False).astype(np.int8)
+
+            # Missing values: carry the driver's last known value forward, then fall back to the field
+            fill = ['TireAge', 'Position', 'GapToLeader', 'RollingLapTime']
+            laps[fill] = laps.groupby('Driver', sort=False)[fill].ffill()
+            laps['TireAge'] = laps['TireAge'].fillna(laps['LapNumber'])
+            laps['Position'] = laps['Position'].fillna(laps['Position'].max() + 1 if laps['Position'].notna().any() else 20)
+            laps['GapToLeader'] = laps['GapToLeader'].fillna(0.0)
+            laps['RollingLapTime'] = laps['RollingLapTime'].fillna(laps['RollingLapTime'].median())
+
+            laps['TrackTemp'] = self._track_temp_at(laps['Time'], weather_data)
+
+            return laps[['Driver', *PIT_STOP_FEATURES, 'PitNextLap']]
         except Exception as e:
             logger.error(f"Error preparing pit stop features: {e}")
             return pd.DataFrame()
 
+    def update_pit_stop_features(self, features, lap_data, new_laps, weather_data, window=PIT_ROLLING_WINDOW):
+        """
+        Brings features from prepare_pit_stop_features up to date with new_laps
+        (the rows appended to lap_data since). Only laps from the one before the
+        first new lap onwards are recomputed: the new laps, and the previous lap
+        whose PitNextLap label they decide, with `window` laps of context for the
+        rolling mean. Each driver's rows stay in lap order.
+        """
+        if features.empty or new_laps.empty:
+            return self.prepare_pit_stop_features(lap_data, weather_data, window) if features.empty else features
+
+        first_new = new_laps['LapNumber'].min()
+        context = lap_data[lap_data['LapNumber'] >= first_new - window]
+        recomputed = self.prepare_pit_stop_features(context, weather_data, window)
+        if recomputed.empty:
+            return features
+        kept = features[features['LapNumber'] < first_new - 1]
+        return pd.concat([kept, recomputed[recomputed['LapNumber'] >= first_new - 1]], ignore_index=True)
+
+    def _track_temp_at(self, times, weather_data):
+        # Latest weather sample at or before each time (laps without a time get the first sample)
+        if weather_data is None or weather_data.empty or 'TrackTemp' not in weather_data.columns:
+            return np.full(len(times), DEFAULT_TRACK_TEMP)
+
+        weather = weather_data[['Time', 'TrackTemp']].dropna().sort_values('Time')
+        if weather.empty:
+            return np.full(len(times), DEFAULT_TRACK_TEMP)
+        left = pd.DataFrame({'Time': times.fillna(weather['Time'].iloc[0]), 'row': np.arange(len(times))})
+        merged = pd.merge_asof(left.sort_values('Time'), weather, on='Time', direction='backward')
+        temps = merged.sort_values('row')['TrackTemp']
+        return temps.fillna(weather['TrackTemp'].iloc[0]).to_numpy()
+
     def prepare_tire_deg_features(self, lap_data):
         """
         Prepares features for Tire Degradation Model.
@@ -1,8 +1,12 @@
 import fastf1
+import os
 import pandas as pd
 import logging
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 from backend.caching import ttl_cache
-import requests
+from backend.http_client import fetch_json
+from backend import historical_store
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -17,31 +21,46 @@ ERGAST_BASE_URL = "http://api.openf1.org/1.0" # Or the new mirror if original is
 # FastF1 suggests using their own data or OpenF1. 
 # For now, let's use the standard Ergast endpoints which are often mirrored.
 # Actually, let's use the new Jolpica API which is a drop-in replacement for Ergast and is maintained.
-ERGAST_API_URL = "http://api.jolpi.ca/ergast/f1" 
+# Can be pointed at a local mirror or a fake server for offline ingest/tests.
+ERGAST_API_URL = os.environ.get("F1DASH_ERGAST_API_URL", "http://api.jolpi.ca/ergast/f1")
 
-@ttl_cache(ttl_seconds=3600) # Cache for 1 hour as historical data doesn't change often
-def get_driver_standings_history(year):
+# Shared by batch fetches; a season overview needs three requests at once
+_executor = ThreadPoolExecutor(max_workers=6, thread_name_prefix="historical")
+
+def season_end(year):
+    """Time (epoch seconds) after which a season's data no longer changes."""
+    return datetime(int(year) + 1, 1, 1).timestamp()
+
+def _driver_code(driver):
+    # Older drivers have no three-letter code in Ergast
+    return driver.get('code') or driver.get('familyName', 'N/A')[:3].upper()
+
+def fetch_driver_standings(year, refresh=False):
     """
-    Fetches driver standings for a specific year.
+    Fetches driver standings for a specific year from the API (no caching).
     """
     try:
         url = f"{ERGAST_API_URL}/{year}/driverStandings.json?limit=100"
-        response = requests.get(url)
-        if response.status_code != 200:
+        data = fetch_json(url, final_after=season_end(year), refresh=refresh)
+        if data is None:
             return pd.DataFrame()
             
-        data = response.json()
-        standings_list = data['MRData']['StandingsTable']['StandingsLists'][0]['DriverStandings']
+        standings_lists = data['MRData']['StandingsTable']['StandingsLists']
+        if not standings_lists:
+            return pd.DataFrame()
+        standings_list = standings_lists[0]['DriverStandings']
         
         drivers = []
         for item in standings_list:
             drivers.append({
-                'Position': int(item['position']),
+                # Excluded drivers (e.g. disqualified from the championship) have no position
+                'Position': int(item['position']) if 'position' in item else 0,
                 'Points': float(item['points']),
                 'Wins': int(item['wins']),
-                'Driver': item['Driver']['code'],
+                'Driver': _driver_code(item['Driver']),
+                'DriverId': item['Driver']['driverId'],
                 'Name': f"{item['Driver']['givenName']} {item['Driver']['familyName']}",
-                'Constructor': item['Constructors'][0]['name']
+                'Constructor': item['Constructors'][0]['name'] if item['Constructors'] else 'N/A'
             })
             
         return pd.DataFrame(drivers)
@@ -49,24 +68,25 @@ def get_driver_standings_history(year):
         logger.error(f"Error fetching driver standings for {year}: {e}")
         return pd.DataFrame()
 
-@ttl_cache(ttl_seconds=3600)
-def get_constructor_standings_history(year):
+def fetch_constructor_standings(year, refresh=False):
     """
-    Fetches constructor standings for a specific year.
+    Fetches constructor standings for a specific year from the API (no caching).
     """
     try:
         url = f"{ERGAST_API_URL}/{year}/constructorStandings.json?limit=100"
-        response = requests.get(url)
-        if response.status_code != 200:
+        data = fetch_json(url, final_after=season_end(year), refresh=refresh)
+        if data is None:
             return pd.DataFrame()
             
-        data = response.json()
-        standings_list = data['MRData']['StandingsTable']['StandingsLists'][0]['ConstructorStandings']
+        standings_lists = data['MRData']['StandingsTable']['StandingsLists']
+        if not standings_lists:
+            return pd.DataFrame()
+        standings_list = standings_lists[0]['ConstructorStandings']
         
         constructors = []
         for item in standings_list:
             constructors.append({
-                'Position': int(item['position']),
+                'Position': int(item['position']) if 'position' in item else 0,
                 'Points': float(item['points']),
                 'Wins': int(item['wins']),
                 'Constructor': item['Constructor']['name'],
@@ -78,18 +98,16 @@ def get_constructor_standings_history(year):
         logger.error(f"Error fetching constructor standings for {year}: {e}")
         return pd.DataFrame()
 
-@ttl_cache(ttl_seconds=3600)
-def get_season_races(year):
+def fetch_season_races(year, refresh=False):
     """
-    Fetches the list of races for a specific year with results.
+    Fetches the list of races for a specific year with results from the API (no caching).
     """
     try:
         url = f"{ERGAST_API_URL}/{year}/results/1.json?limit=100" # Get winners of each race
-        response = requests.get(url)
-        if response.status_code != 200:
+        data = fetch_json(url, final_after=season_end(year), refresh=refresh)
+        if data is None:
             return pd.DataFrame()
             
-        data = response.json()
         races = data['MRData']['RaceTable']['Races']
         
         race_list = []
@@ -100,7 +118,7 @@ def get_season_races(year):
                 'RaceName': race['raceName'],
                 'Date': race['date'],
                 'Circuit': race['Circuit']['circuitName'],
-                'Winner': result['Driver']['code'],
+                'Winner': _driver_code(result['Driver']),
                 'Constructor': result['Constructor']['name'],
                 'Laps': int(result['laps']),
                 'Time': result['Time']['time'] if 'Time' in result else 'N/A'
@@ -111,22 +129,219 @@ def get_season_races(year):
         logger.error(f"Error fetching season races for {year}: {e}")
         return pd.DataFrame()
 
+def fetch_race_results(year, round_number, refresh=False):
+    """
+    Fetches the full classification of one race from the API (no caching).
+    """
+    try:
+        url = f"{ERGAST_API_URL}/{year}/{round_number}/results.json?limit=100"
+        data = fetch_json(url, final_after=season_end(year), refresh=refresh)
+        if data is None:
+            return pd.DataFrame()
+
+        races = data['MRData']['RaceTable']['Races']
+        if not races:
+            return pd.DataFrame()
+
+        results = []
+        for result in races[0]['Results']:
+            results.append({
+                'Position': result.get('positionText', result.get('position', '')),
+                'Driver': _driver_code(result['Driver']),
+                'Name': f"{result['Driver'].get('givenName', '')} {result['Driver'].get('familyName', '')}".strip(),
+                'Constructor': result['Constructor']['name'],
+                'Grid': int(result.get('grid', 0) or 0),
+                'Laps': int(result.get('laps', 0) or 0),
+                'Status': result.get('status', ''),
+                'Points': float(result.get('points', 0) or 0),
+                'Time': result['Time']['time'] if 'Time' in result else ''
+            })
+
+        return pd.DataFrame(results)
+    except Exception as e:
+        logger.error(f"Error fetching results for {year} round {round_number}: {e}")
+        return pd.DataFrame()
+
+# Store table backing each fetcher
+SEASON_FETCHERS = {
+    'driver_standings': fetch_driver_standings,
+    'constructor_standings': fetch_constructor_standings,
+    'races': fetch_season_races,
+}
+
+def _from_store_or_fetch(table, year):
+    """
+    Answers finished seasons from the local archive. The network is only used for
+    seasons not ingested yet, and for seasons ingested before they ended (including
+    the current one), whose rows are then updated.
+    """
+    try:
+        stored = historical_store.load_season(table, year)
+        fetched_at = historical_store.ingested_at(table, year)
+    except Exception as e:
+        logger.warning(f"Historical store unavailable: {e}")
+        stored, fetched_at = None, None
+
+    if stored is not None and fetched_at is not None and fetched_at >= season_end(year):
+        return stored
+
+    df = SEASON_FETCHERS[table](year)
+    if df.empty:
+        # Keep serving what we have if the API is unreachable
+        return stored if stored is not None else df
+
+    try:
+        historical_store.save_season(table, year, df)
+    except Exception as e:
+        logger.warning(f"Could not store {table} for {year}: {e}")
+    return df
+
+@ttl_cache(ttl_seconds=3600) # Cache for 1 hour as historical data doesn't change often
+def get_driver_standings_history(year):
+    """
+    Returns driver standings for a specific year.
+    """
+    return _from_store_or_fetch('driver_standings', year)
+
+@ttl_cache(ttl_seconds=3600)
+def get_constructor_standings_history(year):
+    """
+    Returns constructor standings for a specific year.
+    """
+    return _from_store_or_fetch('constructor_standings', year)
+
+@ttl_cache(ttl_seconds=3600)
+def get_season_races(year):
+    """
+    Returns the list of races for a specific year with results.
+    """
+    return _from_store_or_fetch('races', year)
+
+@ttl_cache(ttl_seconds=3600)
+def get_race_results(year, round_number):
+    """
+    Returns the full classification of one race.
+    """
+    return fetch_race_results(year, round_number)
+
+def get_season_overview(year):
+    """
+    Fetches driver standings, constructor standings and races for a season concurrently.
+    Each dataset goes through its own cached function, so caching is unchanged.
+    Returns {'driver_standings': df, 'constructor_standings': df, 'races': df}.
+    """
+    futures = {
+        'driver_standings': _executor.submit(get_driver_standings_history, year),
+        'constructor_standings': _executor.submit(get_constructor_standings_history, year),
+        'races': _executor.submit(get_season_races, year)
+    }
+    return {name: future.result() for name, future in futures.items()}
+
+# Jolpica caps page size at 100 results
+RESULTS_PAGE_SIZE = 100
+
+def _parse_driver_results(data):
+    rows = []
+    for race in data['MRData']['RaceTable']['Races']:
+        for result in race['Results']:
+            rows.append({
+                'Season': int(race['season']),
+                'Round': int(race['round']),
+                'RaceName': race['raceName'],
+                'Date': race.get('date'),
+                'Constructor': result['Constructor']['name'],
+                'Grid': int(result.get('grid', 0) or 0),
+                'Position': int(result['position']) if 'position' in result else None,
+                'PositionText': result.get('positionText', result.get('position', '')),
+                'Points': float(result.get('points', 0) or 0),
+                'Status': result.get('status', '')
+            })
+    return rows
+
+def fetch_driver_results(driver_id, offset=0):
+    """
+    Fetches a driver's race results from offset onwards (no caching).
+    The first page reports the total; the remaining pages are fetched concurrently.
+    """
+    url = f"{ERGAST_API_URL}/drivers/{driver_id}/results.json?limit={RESULTS_PAGE_SIZE}&offset={{}}"
+    first = fetch_json(url.format(offset))
+    if first is None:
+        return None
+
+    total = int(first['MRData']['total'])
+    offsets = range(offset + RESULTS_PAGE_SIZE, total, RESULTS_PAGE_SIZE)
+    pages = [first] + list(_executor.map(lambda o: fetch_json(url.format(o)), offsets))
+    if any(page is None for page in pages):
+        return None
+
+    rows = [row for page in pages for row in _parse_driver_results(page)]
+    return pd.DataFrame(rows, columns=historical_store.RESULT_COLUMNS)
+
+def aggregate_driver_results(results):
+    """
+    Vectorized career aggregates of a batch of results:
+    per-season starts (one per car driven, so a shared drive counts twice), wins,
+    podiums and points, and the finishing-position distribution (classified positions, anything else counted as 'DNF').
+    """
+    position = pd.to_numeric(results['PositionText'], errors='coerce')
+    season_stats = pd.DataFrame({
+        'Season': results['Season'],
+        'Starts': 1,
+        'Wins': (position == 1).astype(int),
+        'Podiums': (position <= 3).astype(int),
+        'Points': results['Points'].astype(float)
+    }).groupby('Season', as_index=False).sum()
+
+    finish = position.astype('Int64').astype(str).where(position.notna(), 'DNF')
+    position_counts = finish.value_counts().rename_axis('Finish').reset_index(name='Count')
+    return season_stats, position_counts
+
+@ttl_cache(ttl_seconds=86400) # Check for new races at most once a day
+def update_driver_career(driver_id):
+    """
+    Brings a driver's stored results and aggregates up to date.
+    Only races after the last stored result are fetched and aggregated, so
+    drivers with hundreds of starts cost one request once they're stored.
+    Returns the number of new results.
+    """
+    try:
+        offset = historical_store.count_driver_results(driver_id)
+        new_results = fetch_driver_results(driver_id, offset=offset)
+        if new_results is None or new_results.empty:
+            return 0
+
+        season_stats, position_counts = aggregate_driver_results(new_results)
+        historical_store.append_driver_results(driver_id, new_results, season_stats, position_counts)
+        logger.info(f"Stored {len(new_results)} new results for {driver_id}")
+        return len(new_results)
+    except Exception as e:
+        logger.error(f"Error updating career results for {driver_id}: {e}")
+        return 0
+
 @ttl_cache(ttl_seconds=86400) # Cache for 24 hours
 def get_driver_career_stats(driver_id):
     """
-    Fetches career stats for a driver (mocked/simplified via Ergast).
-    Note: Ergast doesn't have a single 'career stats' endpoint, 
-    so we might need to aggregate or just fetch their season history.
-    For this dashboard, let's fetch their finishing positions for the last 5 years.
+    Career stats for a driver, one row per season: Season, Starts, Wins, Podiums, Points.
+    driver_id is the Ergast driverId (e.g. 'max_verstappen'), not the code ('VER').
     """
-    # This is expensive to compute via raw API calls for every race.
-    # We will fetch their year-by-year standings instead.
     try:
-        # We need the driverId (e.g. 'max_verstappen') not the code ('VER')
-        # Assuming driver_id is passed correctly.
-        
-        # Actually, let's just return a mock or a simple list of recent seasons for the demo
-        # to avoid making 20 API calls.
+        update_driver_career(driver_id)
+        return historical_store.load_driver_season_stats(driver_id)
+    except Exception as e:
+        logger.error(f"Error loading career stats for {driver_id}: {e}")
         return pd.DataFrame()
+
+@ttl_cache(ttl_seconds=86400)
+def get_driver_position_distribution(driver_id):
+    """
+    How often a driver finished in each position ('DNF' for unclassified results).
+    """
+    try:
+        update_driver_career(driver_id)
+        counts = historical_store.load_driver_position_counts(driver_id)
+        # Numeric positions first, in order, then DNF
+        order = pd.to_numeric(counts['Finish'], errors='coerce').fillna(float('inf'))
+        return counts.iloc[order.argsort(kind='stable')].reset_index(drop=True)
     except Exception as e:
+        logger.error(f"Error loading position distribution for {driver_id}: {e}")
         return pd.DataFrame()
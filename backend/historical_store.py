@@ -0,0 +1,185 @@
+import os
+import time
+import sqlite3
+import threading
+import logging
+import pandas as pd
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Local archive of Ergast-format data, filled by `python -m backend.ingest_history`
+HISTORY_DB_PATH = os.environ.get("F1DASH_HISTORY_DB", "backend/cache/history.sqlite")
+
+# Columns stored per table, in DataFrame order. Every table is keyed and indexed by season.
+STORE_TABLES = {
+    'driver_standings': ['Position', 'Points', 'Wins', 'Driver', 'DriverId', 'Name', 'Constructor'],
+    'constructor_standings': ['Position', 'Points', 'Wins', 'Constructor', 'Nationality'],
+    'races': ['Round', 'RaceName', 'Date', 'Circuit', 'Winner', 'Constructor', 'Laps', 'Time'],
+}
+
+_local = threading.local()
+_write_lock = threading.Lock()
+
+
+def _connect():
+    """One connection per thread; sqlite3 connections can't be shared across threads."""
+    conn = getattr(_local, 'conn', None)
+    if conn is None or getattr(_local, 'path', None) != HISTORY_DB_PATH:
+        os.makedirs(os.path.dirname(HISTORY_DB_PATH) or ".", exist_ok=True)
+        conn = sqlite3.connect(HISTORY_DB_PATH, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        _create_schema(conn)
+        _create_career_schema(conn)
+        _local.conn = conn
+        _local.path = HISTORY_DB_PATH
+    return conn
+
+
+def _create_schema(conn):
+    with conn:
+        for table, columns in STORE_TABLES.items():
+            column_sql = ", ".join(f'"{c}"' for c in columns)
+            conn.execute(f'CREATE TABLE IF NOT EXISTS {table} (season INTEGER NOT NULL, {column_sql})')
+            conn.execute(f'CREATE INDEX IF NOT EXISTS idx_{table}_season ON {table}(season)')
+        # Which (table, season) pairs have been ingested, so an empty season isn't refetched
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS ingested ('
+            'tbl TEXT NOT NULL, season INTEGER NOT NULL, fetched_at REAL NOT NULL, '
+            'PRIMARY KEY (tbl, season))'
+        )
+
+
+def load_season(table, season):
+    """
+    Returns the stored rows of a table for one season, or None if that season
+    was never ingested.
+    """
+    conn = _connect()
+    row = conn.execute('SELECT 1 FROM ingested WHERE tbl = ? AND season = ?', (table, int(season))).fetchone()
+    if row is None:
+        return None
+
+    columns = STORE_TABLES[table]
+    column_sql = ", ".join(f'"{c}"' for c in columns)
+    rows = conn.execute(f'SELECT {column_sql} FROM {table} WHERE season = ? ORDER BY rowid', (int(season),)).fetchall()
+    return pd.DataFrame(rows, columns=columns)
+
+
+def save_season(table, season, df):
+    """Replaces the stored rows of a table for one season."""
+    columns = STORE_TABLES[table]
+    df = df.reindex(columns=columns)
+    rows = [(int(season), *(None if pd.isna(v) else v for v in record))
+            for record in df.astype(object).itertuples(index=False, name=None)]
+
+    placeholders = ", ".join("?" for _ in range(len(columns) + 1))
+    conn = _connect()
+    with _write_lock, conn:
+        conn.execute(f'DELETE FROM {table} WHERE season = ?', (int(season),))
+        conn.executemany(f'INSERT INTO {table} VALUES ({placeholders})', rows)
+        conn.execute('INSERT OR REPLACE INTO ingested VALUES (?, ?, ?)', (table, int(season), time.time()))
+
+
+def ingested_at(table, season):
+    """When a season of a table was last ingested (epoch seconds), or None if never."""
+    row = _connect().execute('SELECT fetched_at FROM ingested WHERE tbl = ? AND season = ?', (table, int(season))).fetchone()
+    return row[0] if row else None
+
+
+def ingested_seasons(table):
+    """Seasons of a table present in the store."""
+    rows = _connect().execute('SELECT season FROM ingested WHERE tbl = ? ORDER BY season', (table,)).fetchall()
+    return [r[0] for r in rows]
+
+
+# Per-driver race results and the career aggregates built from them
+RESULT_COLUMNS = ['Season', 'Round', 'RaceName', 'Date', 'Constructor', 'Grid', 'Position', 'PositionText', 'Points', 'Status']
+
+
+# Tables built from a driver's results, dropped together when their layout changes
+CAREER_TABLES = ('driver_results', 'driver_season_stats', 'driver_position_counts')
+
+
+def _create_career_schema(conn):
+    # Results used to be keyed by race only, which rejects shared drives (two cars in
+    # one race); rebuild the career tables, they're refetched on the next update
+    key = [row[1] for row in conn.execute('PRAGMA table_info(driver_results)') if row[5]]
+    if key and 'Position' not in key:
+        logger.info("Rebuilding career tables with the new results key")
+        with conn:
+            for table in CAREER_TABLES:
+                conn.execute(f'DROP TABLE IF EXISTS {table}')
+
+    with conn:
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS driver_results ('
+            'driver_id TEXT NOT NULL, "Season" INTEGER NOT NULL, "Round" INTEGER NOT NULL, '
+            '"RaceName" TEXT, "Date" TEXT, "Constructor" TEXT, "Grid" INTEGER, "Position" INTEGER, '
+            '"PositionText" TEXT, "Points" REAL, "Status" TEXT, '
+            'PRIMARY KEY (driver_id, "Season", "Round", "Position"))'
+        )
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS driver_season_stats ('
+            'driver_id TEXT NOT NULL, "Season" INTEGER NOT NULL, "Starts" INTEGER NOT NULL, '
+            '"Wins" INTEGER NOT NULL, "Podiums" INTEGER NOT NULL, "Points" REAL NOT NULL, '
+            'PRIMARY KEY (driver_id, "Season"))'
+        )
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS driver_position_counts ('
+            'driver_id TEXT NOT NULL, "Finish" TEXT NOT NULL, "Count" INTEGER NOT NULL, '
+            'PRIMARY KEY (driver_id, "Finish"))'
+        )
+
+
+def count_driver_results(driver_id):
+    """Number of results stored for a driver (the offset to resume fetching from)."""
+    row = _connect().execute('SELECT COUNT(*) FROM driver_results WHERE driver_id = ?', (driver_id,)).fetchone()
+    return row[0]
+
+
+def append_driver_results(driver_id, results, season_stats, position_counts):
+    """
+    Stores newly fetched results of a driver and folds their aggregates into the
+    running totals in one transaction, so totals always match the stored results.
+    """
+    placeholders = ", ".join("?" for _ in range(len(RESULT_COLUMNS) + 1))
+    result_rows = [(driver_id, *(None if pd.isna(v) else v for v in record))
+                   for record in results.reindex(columns=RESULT_COLUMNS).astype(object).itertuples(index=False, name=None)]
+
+    conn = _connect()
+    with _write_lock, conn:
+        inserted = conn.total_changes
+        conn.executemany(f'INSERT OR IGNORE INTO driver_results VALUES ({placeholders})', result_rows)
+        if conn.total_changes - inserted != len(result_rows):
+            # Some rows were already stored; roll back rather than double count them in the totals
+            raise ValueError(f"Overlapping results for {driver_id}")
+        conn.executemany(
+            'INSERT INTO driver_season_stats VALUES (?, ?, ?, ?, ?, ?) '
+            'ON CONFLICT (driver_id, "Season") DO UPDATE SET '
+            '"Starts" = "Starts" + excluded."Starts", "Wins" = "Wins" + excluded."Wins", '
+            '"Podiums" = "Podiums" + excluded."Podiums", "Points" = "Points" + excluded."Points"',
+            [(driver_id, int(r.Season), int(r.Starts), int(r.Wins), int(r.Podiums), float(r.Points))
+             for r in season_stats.itertuples(index=False)]
+        )
+        conn.executemany(
+            'INSERT INTO driver_position_counts VALUES (?, ?, ?) '
+            'ON CONFLICT (driver_id, "Finish") DO UPDATE SET "Count" = "Count" + excluded."Count"',
+            [(driver_id, str(r.Finish), int(r.Count)) for r in position_counts.itertuples(index=False)]
+        )
+
+
+def load_driver_season_stats(driver_id):
+    rows = _connect().execute(
+        'SELECT "Season", "Starts", "Wins", "Podiums", "Points" FROM driver_season_stats '
+        'WHERE driver_id = ? ORDER BY "Season"', (driver_id,)
+    ).fetchall()
+    return pd.DataFrame(rows, columns=['Season', 'Starts', 'Wins', 'Podiums', 'Points'])
+
+
+def load_driver_position_counts(driver_id):
+    rows = _connect().execute(
+        'SELECT "Finish", "Count" FROM driver_position_counts WHERE driver_id = ?', (driver_id,)
+    ).fetchall()
+    return pd.DataFrame(rows, columns=['Finish', 'Count'])
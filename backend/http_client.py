@@ -0,0 +1,157 @@
+import os
+import json
+import time
+import hashlib
+import threading
+import logging
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# (connect, read) timeouts in seconds
+DEFAULT_TIMEOUT = (5, 20)
+
+# Retry transient failures with exponential backoff (0.5s, 1s, 2s), honouring Retry-After
+RETRY_POLICY = Retry(
+    total=3,
+    backoff_factor=0.5,
+    status_forcelist=(429, 500, 502, 503, 504),
+    allowed_methods=frozenset(["GET"]),
+    respect_retry_after_header=True
+)
+
+# Raw response bodies with their validators, so restarts don't re-pull the archive.
+# Structure: {HTTP_CACHE_DIR}/{url digest}.body and {url digest}.meta.json
+HTTP_CACHE_DIR = os.environ.get("F1DASH_HTTP_CACHE_DIR", "backend/cache/http")
+
+_SESSION = None
+_SESSION_LOCK = threading.Lock()
+
+
+def get_http_session():
+    """
+    Returns the process-wide requests.Session.
+    Connections are kept alive and pooled, so repeated calls to the same host
+    skip the TCP/TLS handshake.
+    """
+    global _SESSION
+    if _SESSION is None:
+        with _SESSION_LOCK:
+            if _SESSION is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=RETRY_POLICY)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                session.headers.update({"Accept": "application/json"})
+                _SESSION = session
+    return _SESSION
+
+
+def _cache_paths(url):
+    digest = hashlib.blake2b(url.encode("utf-8"), digest_size=16).hexdigest()
+    base = os.path.join(HTTP_CACHE_DIR, digest)
+    return f"{base}.body", f"{base}.meta.json"
+
+
+def _atomic_write(path, data):
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def read_cached_response(url):
+    """Returns (body bytes, meta dict) of a cached response, or (None, None)."""
+    body_path, meta_path = _cache_paths(url)
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        with open(body_path, "rb") as f:
+            return f.read(), meta
+    except (OSError, ValueError):
+        return None, None
+
+
+def write_cached_response(url, body, headers):
+    """Stores a response body with its ETag/Last-Modified validators."""
+    body_path, meta_path = _cache_paths(url)
+    meta = {
+        "url": url,
+        "etag": headers.get("ETag"),
+        "last_modified": headers.get("Last-Modified"),
+        "fetched_at": time.time()
+    }
+    try:
+        os.makedirs(HTTP_CACHE_DIR, exist_ok=True)
+        # Body first: a meta file only ever points at a complete body
+        _atomic_write(body_path, body)
+        _atomic_write(meta_path, json.dumps(meta).encode("utf-8"))
+    except OSError as e:
+        logger.warning(f"Could not cache response for {url}: {e}")
+
+
+def _touch_cached_response(url, meta):
+    _, meta_path = _cache_paths(url)
+    try:
+        _atomic_write(meta_path, json.dumps(dict(meta, fetched_at=time.time())).encode("utf-8"))
+    except OSError:
+        pass
+
+
+def clear_http_cache():
+    """Removes every cached response."""
+    if not os.path.isdir(HTTP_CACHE_DIR):
+        return
+    for name in os.listdir(HTTP_CACHE_DIR):
+        if name.endswith((".body", ".meta.json")):
+            os.remove(os.path.join(HTTP_CACHE_DIR, name))
+    logger.info(f"HTTP cache cleared: {HTTP_CACHE_DIR}")
+
+
+def fetch_json(url, timeout=DEFAULT_TIMEOUT, final_after=None, refresh=False):
+    """
+    GETs url through the shared session and returns the decoded JSON,
+    or None if the request failed or didn't return 200.
+
+    Responses are cached on disk. A cached response is revalidated with
+    If-None-Match/If-Modified-Since, so an unchanged resource costs a 304 with no
+    body. final_after is the time (epoch seconds) after which the resource no
+    longer changes, e.g. the end of a season: a copy fetched after it is returned
+    without any request. refresh=True ignores the cached copy and re-downloads.
+    If the server can't be reached the cached copy is served.
+    """
+    cached_body, meta = (None, None) if refresh else read_cached_response(url)
+    if cached_body is not None and final_after is not None and meta.get("fetched_at", 0) >= final_after:
+        return json.loads(cached_body)
+
+    headers = {}
+    if meta:
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+    try:
+        response = get_http_session().get(url, timeout=timeout, headers=headers)
+    except requests.RequestException as e:
+        if cached_body is not None:
+            logger.warning(f"Request to {url} failed, serving cached response: {e}")
+            return json.loads(cached_body)
+        logger.error(f"Request to {url} failed: {e}")
+        return None
+
+    if response.status_code == 304 and cached_body is not None:
+        _touch_cached_response(url, meta)
+        return json.loads(cached_body)
+
+    if response.status_code != 200:
+        logger.warning(f"Request to {url} returned {response.status_code}")
+        return None
+
+    data = response.json()
+    write_cached_response(url, response.content, response.headers)
+    return data
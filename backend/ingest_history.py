@@ -0,0 +1,73 @@
+"""
+Bulk-loads historical seasons into the local archive (backend/historical_store).
+
+Usage:
+    python -m backend.ingest_history --from 1950 --to 2024
+    python -m backend.ingest_history --from 2023 --to 2023 --force
+    F1DASH_ERGAST_API_URL=http://localhost:8000/ergast/f1 python -m backend.ingest_history --from 2020 --to 2021
+"""
+import argparse
+import logging
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from backend import historical_store
+from backend.historical_data import SEASON_FETCHERS, season_end
+
+logger = logging.getLogger(__name__)
+
+
+def ingest_season(year, force=False):
+    """
+    Fetches and stores every table for one season.
+    Seasons stored after they ended are skipped unless force is set; seasons
+    ingested while still running are fetched again.
+    Returns the number of tables written.
+    """
+    written = 0
+    for table, fetch in SEASON_FETCHERS.items():
+        fetched_at = historical_store.ingested_at(table, year)
+        if not force and fetched_at is not None and fetched_at >= season_end(year):
+            continue
+        # Forced ingests bypass the HTTP cache too, which may hold partial seasons
+        df = fetch(year, refresh=force)
+        if df.empty:
+            logger.warning(f"No {table} data for {year}; will retry on next ingest.")
+            continue
+        historical_store.save_season(table, year, df)
+        written += 1
+    return written
+
+
+def ingest(first_year, last_year, workers=4, force=False):
+    """Ingests a range of seasons concurrently. Returns {year: tables written}."""
+    years = list(range(first_year, last_year + 1))
+    written = {}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(ingest_season, year, force): year for year in years}
+        for future in as_completed(futures):
+            year = futures[future]
+            try:
+                written[year] = future.result()
+                logger.info(f"Ingested {year}: {written[year]} tables written")
+            except Exception as e:
+                logger.error(f"Failed to ingest {year}: {e}")
+    return written
+
+
+def main(argv=None):
+    current_year = datetime.now().year
+    parser = argparse.ArgumentParser(description="Ingest Ergast-format historical data into the local archive.")
+    parser.add_argument("--from", dest="first_year", type=int, default=1950)
+    parser.add_argument("--to", dest="last_year", type=int, default=current_year)
+    parser.add_argument("--workers", type=int, default=4, help="Seasons fetched in parallel")
+    parser.add_argument("--force", action="store_true", help="Re-fetch seasons already in the store")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    written = ingest(args.first_year, args.last_year, workers=args.workers, force=args.force)
+    logger.info(f"Done: {sum(written.values())} tables written for {len(written)} seasons into {historical_store.HISTORY_DB_PATH}")
+
+
+if __name__ == "__main__":
+    main()
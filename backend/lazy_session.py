@@ -0,0 +1,300 @@
+import threading
+import logging
+from datetime import timedelta
+
+import fastf1
+import numpy as np
+import pandas as pd
+from fastf1.core import Laps, SessionResults
+
+from backend import disk_cache
+from backend.caching import estimate_size
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Session tables persisted to the disk tier once the session is final
+SESSION_TABLES = ("results", "laps", "weather_data")
+
+# A session this long after its start won't change any more, so persisted tables can be trusted
+SESSION_FINAL_AFTER = timedelta(hours=6)
+
+# Identifies a lap row across reloads
+LAP_KEY = ['DriverNumber', 'LapNumber']
+
+# fastf1.Cache.disabled() flips a process-wide flag; uncached loads take turns so
+# one ending doesn't re-enable the cache under another
+_UNCACHED_LOAD_LOCK = threading.Lock()
+
+
+def session_identity(session):
+    """
+    Identifies a session by (year, round, session type, data version).
+    Used as the cache key for Session arguments instead of repr()-ing the whole object.
+    """
+    return (
+        int(session.event.year),
+        int(session.event['RoundNumber']),
+        session.name,
+        getattr(session, 'data_version', 0)
+    )
+
+
+class LazySession:
+    """
+    Facade over a FastF1 Session that loads data in tiers, on first use:
+    results and metadata first, laps and weather when accessed, telemetry only
+    when a driver's trace is requested.
+
+    For finished sessions every table is also persisted to the disk tier and read
+    back from there (memory-mapped) before going to the FastF1 API.
+    Anything not defined here is delegated to the wrapped Session.
+
+    Running sessions are always loaded with FastF1's cache disabled, since it would
+    replay the responses of the first load instead of the latest timing data.
+
+    Laps are append-only: refresh() keeps existing rows where they are and adds
+    newly completed laps at the end, so row positions stay valid across versions
+    and lap_delta() can hand derived tables just the new rows.
+    """
+    def __init__(self, session):
+        self._session = session
+        self._lock = threading.RLock()
+        self._tables = {}
+        self._telemetry_loaded = False
+        self._size = 0
+
+        # Number of lap rows; identifies which copy of the data derived caches were built from.
+        # Only ever increases; _version_rows maps each version to its lap row count.
+        self.data_version = 0
+        self._version_rows = {}
+        self._use_disk = self._is_final()
+        if self._use_disk:
+            manifest = disk_cache.read_table("session", (self.base_identity, "manifest"))
+            if manifest is not None and not manifest.empty:
+                self.data_version = int(manifest['data_version'].iloc[0])
+
+    def __getattr__(self, name):
+        # Only called for attributes not found on the facade itself
+        return getattr(self.__dict__['_session'], name)
+
+    @property
+    def session(self):
+        """The wrapped FastF1 Session."""
+        return self._session
+
+    @property
+    def base_identity(self):
+        return (int(self._session.event.year), int(self._session.event['RoundNumber']), self._session.name)
+
+    @property
+    def results(self):
+        return self._table("results")
+
+    @property
+    def laps(self):
+        return self._table("laps")
+
+    @property
+    def weather_data(self):
+        return self._table("weather_data")
+
+    @property
+    def drivers(self):
+        return list(self.results['DriverNumber'].unique())
+
+    @property
+    def car_data(self):
+        self.ensure_telemetry()
+        return self._session.car_data
+
+    @property
+    def pos_data(self):
+        self.ensure_telemetry()
+        return self._session.pos_data
+
+    def cache_size(self):
+        """
+        Bytes held by the tiers loaded so far, including the wrapped Session's own
+        copies and telemetry. Measured when a tier loads, so reading it is free;
+        the cache sweeper picks up the new size.
+        """
+        return self._size
+
+    def _measure(self):
+        session_data = {
+            name: self._session.__dict__.get(name)
+            for name in ('_results', '_laps', '_weather_data', '_car_data', '_pos_data')
+        }
+        self._size = estimate_size([self._tables, session_data])
+
+    def is_loaded(self, name):
+        """Whether a table (or 'telemetry') has been loaded, without triggering a load."""
+        if name == "telemetry":
+            return self._telemetry_loaded
+        return name in self._tables
+
+    def ensure_telemetry(self):
+        """
+        Loads car and position data. FastF1 only provides telemetry for the whole
+        field at once, so this runs at most once per session; per-driver results are
+        cached by get_car_telemetry so later requests don't need it.
+        """
+        if self._telemetry_loaded:
+            return
+        with self._lock:
+            if self._telemetry_loaded:
+                return
+            logger.info(f"Loading telemetry for {self.base_identity}")
+            self._load_session(laps=True, telemetry=True, weather=False, messages=True)
+            # Laps now carry LapStartDate and are bound to the loaded telemetry
+            self._append_laps(self._session.laps)
+            self._telemetry_loaded = True
+            self._measure()
+
+    def refresh(self):
+        """
+        Reloads a session that's still running. Results and weather are replaced;
+        if laps were loaded, laps completed since the last load are appended.
+        Returns the number of new laps. Does nothing for finished sessions.
+        Running sessions are loaded with FastF1's cache disabled, which would
+        otherwise hand back the responses of the first load.
+        """
+        with self._lock:
+            if self._use_disk:
+                return 0
+            laps_loaded = "laps" in self._tables
+            previous = self.data_version
+            self._load_session(laps=laps_loaded, telemetry=False, weather=True, messages=laps_loaded)
+            self._tables["results"] = self._session.results
+            self._tables["weather_data"] = self._session.weather_data
+            if not laps_loaded:
+                self._measure()
+                logger.info(f"Refreshed {self.base_identity}: results and weather")
+                return 0
+
+            self._append_laps(self._session.laps)
+            if self.data_version != previous:
+                # New laps have no car data yet; the next telemetry request reloads it
+                self._telemetry_loaded = False
+            self._measure()
+            added = self.data_version - previous
+            logger.info(f"Refreshed {self.base_identity}: {added} new laps (version {self.data_version})")
+            return added
+
+    def lap_delta(self, since_version=None):
+        """
+        Laps added after since_version, as (version, first row position, rows).
+        If since_version is None or unknown (e.g. from before a rebase), all laps are
+        returned with first row position 0, meaning derived tables must be rebuilt.
+        """
+        laps = self.laps
+        with self._lock:
+            laps = self._tables.get("laps", laps)
+            version = self.data_version
+            start = self._version_rows.get(since_version, 0) if since_version is not None else 0
+            return version, start, laps.iloc[start:]
+
+    def _append_laps(self, fresh):
+        """
+        Replaces the laps table with fresh, reordered so existing laps keep their row
+        positions and new laps come last. Bumps data_version if laps were added.
+        """
+        current = self._tables.get("laps")
+        if current is None or current.empty:
+            self._set_laps(fresh, len(fresh))
+            return
+
+        current_keys = pd.MultiIndex.from_frame(current[LAP_KEY])
+        fresh_keys = pd.MultiIndex.from_frame(fresh[LAP_KEY])
+        # get_indexer needs unique keys, so check for duplicates first
+        duplicated = current_keys.has_duplicates or fresh_keys.has_duplicates
+        positions = None if duplicated else fresh_keys.get_indexer(current_keys)
+        if duplicated or (positions < 0).any():
+            # Laps disappeared (e.g. deleted by the timing service) or are duplicated;
+            # rows can't be matched, so start a new base and let derived tables rebuild
+            logger.warning(f"Laps of {self.base_identity} changed in place; rebuilding")
+            self._version_rows.clear()
+            self._set_laps(fresh, self.data_version + len(fresh))
+            return
+
+        new_rows = np.setdiff1d(np.arange(len(fresh)), positions)
+        order = np.concatenate([positions, new_rows])
+        laps = fresh.iloc[order].reset_index(drop=True)
+        self._set_laps(laps, self.data_version + len(new_rows))
+
+    def _set_laps(self, laps, version):
+        self._tables["laps"] = laps
+        self.data_version = version
+        self._version_rows[version] = len(laps)
+        # Laps can arrive through ensure_telemetry() before anything reads them
+        self._persist()
+
+    def _load_session(self, **kwargs):
+        if self._use_disk:
+            self._session.load(**kwargs)
+            return
+        with _UNCACHED_LOAD_LOCK, fastf1.Cache.disabled():
+            self._session.load(**kwargs)
+
+    def _is_final(self):
+        try:
+            return pd.Timestamp.now(tz='UTC') - pd.Timestamp(self._session.date).tz_localize('UTC') > SESSION_FINAL_AFTER
+        except Exception:
+            return False
+
+    def _table(self, name):
+        table = self._tables.get(name)
+        if table is not None:
+            return table
+
+        with self._lock:
+            if name in self._tables:
+                return self._tables[name]
+
+            df = None
+            if self._use_disk and self.data_version:
+                df = disk_cache.read_table("session", (self.base_identity, self.data_version, name))
+
+            if df is not None:
+                table = self._wrap(name, df)
+            else:
+                table = self._load_from_api(name)
+
+            self._tables[name] = table
+            if name == "laps":
+                self._version_rows[self.data_version] = len(table)
+            self._persist()
+            self._measure()
+            return table
+
+    def _wrap(self, name, df):
+        if name == "results":
+            return SessionResults(df)
+        if name == "laps":
+            return Laps(df, session=self._session)
+        return df
+
+    def _load_from_api(self, name):
+        logger.info(f"Loading {name} for {self.base_identity}")
+        if name == "results":
+            self._load_session(laps=False, telemetry=False, weather=False, messages=False)
+        elif name == "laps":
+            self._load_session(laps=True, telemetry=False, weather=False, messages=True)
+            self.data_version = len(self._session.laps)
+        elif name == "weather_data":
+            self._load_session(laps=False, telemetry=False, weather=True, messages=False)
+        return getattr(self._session, name)
+
+    def _persist(self):
+        """Writes loaded tables of a finished session to the disk tier."""
+        if not self._use_disk or not self.data_version:
+            return
+        for name, table in self._tables.items():
+            key = (self.base_identity, self.data_version, name)
+            if not disk_cache.has_table("session", key):
+                disk_cache.write_table("session", key, pd.DataFrame(table))
+        manifest_key = (self.base_identity, "manifest")
+        if not disk_cache.has_table("session", manifest_key):
+            disk_cache.write_table("session", manifest_key, pd.DataFrame({'data_version': [self.data_version]}))
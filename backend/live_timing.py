@@ -0,0 +1,415 @@
+import os
+import ast
+import json
+import time
+import threading
+import logging
+
+import numpy as np
+import pandas as pd
+from fastf1.utils import to_datetime, to_timedelta
+
+from backend.data_loader import STATUS_FINISHED, STATUS_LAPPED, STATUS_NOT_CLASSIFIED
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Live mode is off unless F1DASH_LIVE_MODE is set:
+#   "live"   - record the F1 live-timing feed to F1DASH_LIVE_FILE and follow it
+#   "replay" - feed F1DASH_LIVE_FILE (a recording) at F1DASH_LIVE_SPEED x real time
+LIVE_MODE = os.environ.get("F1DASH_LIVE_MODE", "").lower()
+LIVE_FILE = os.environ.get("F1DASH_LIVE_FILE", "backend/cache/live_timing.txt")
+LIVE_SPEED = float(os.environ.get("F1DASH_LIVE_SPEED", "1"))
+
+# Seconds to wait before reconnecting the live-timing client after it exits
+RECORDER_RESTART_SECONDS = 10
+
+# Feed categories the race state is built from; everything else is skipped
+LIVE_CATEGORIES = ("DriverList", "TimingData", "TimingAppData", "WeatherData", "LapCount", "SessionStatus")
+
+
+def parse_recorded_line(line):
+    """
+    Parses one line written by fastf1.livetiming's SignalRClient into
+    (category, message dict, timestamp). The timestamp is None for the initial
+    state lines written when the client subscribes. Returns None for lines that
+    can't be parsed.
+    """
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        category, message, timestamp = ast.literal_eval(line)
+    except (ValueError, SyntaxError):
+        # Same fix-up FastF1 applies to F1's not quite JSON data
+        try:
+            category, message, timestamp = json.loads(
+                line.replace("'", '"').replace('True', 'true').replace('False', 'false')
+            )
+        except ValueError:
+            return None
+
+    if isinstance(message, str):
+        # Initial state is stored as a JSON string
+        try:
+            message = json.loads(message)
+        except ValueError:
+            return None
+    return category, message, to_datetime(timestamp) if timestamp else None
+
+
+def _merge(base, update):
+    """
+    Applies a feed update in place. Updates are partial: dicts are merged key by key
+    and lists (e.g. Stints) are updated by index, given as string keys.
+    """
+    if isinstance(base, list) and isinstance(update, dict):
+        for key, value in update.items():
+            index = int(key)
+            if index < len(base):
+                base[index] = _merge(base[index], value)
+            else:
+                base.append(value)
+        return base
+    if isinstance(base, dict) and isinstance(update, dict):
+        for key, value in update.items():
+            base[key] = _merge(base[key], value) if key in base else value
+        return base
+    return update
+
+
+def _gap_seconds(text):
+    """'+1.234' -> 1.234; lap gaps ('1L', '+1 LAP') and the leader's 'LAP 12' -> NaN."""
+    try:
+        return float(str(text).lstrip('+'))
+    except ValueError:
+        return np.nan
+
+
+def _laps_behind(text):
+    text = str(text).upper()
+    if text.startswith('LAP') or 'L' not in text:
+        return 0
+    digits = ''.join(c for c in text if c.isdigit())
+    return int(digits) if digits else 1
+
+
+def _value(entry, key):
+    # Timing values come either bare or as {'Value': ...}
+    value = entry.get(key, '')
+    return value.get('Value', '') if isinstance(value, dict) else value
+
+
+class LiveRaceState:
+    """
+    Race state built incrementally from live-timing messages.
+    Feeds call apply() from their own thread; pages call snapshot(), which returns
+    frames shaped like get_live_leaderboard / get_live_tyre_data. Snapshots are
+    rebuilt only when a message arrived since the last one.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data = {category: {} for category in LIVE_CATEGORIES}
+        self.version = 0
+        self.feed_time = None
+        self.updated_at = None
+        self._snapshot = None
+
+    def apply(self, category, message, timestamp=None):
+        """Applies one feed message. Returns False for categories not tracked."""
+        if category not in self._data or not isinstance(message, dict):
+            return False
+        with self._lock:
+            _merge(self._data[category], message)
+            self.version += 1
+            if timestamp is not None:
+                self.feed_time = timestamp
+            self.updated_at = time.time()
+        return True
+
+    def reset(self):
+        """Drops everything received so far, e.g. when the feed starts over."""
+        with self._lock:
+            self._data = {category: {} for category in LIVE_CATEGORIES}
+            self.version += 1
+            self.feed_time = None
+            self.updated_at = None
+
+    def apply_line(self, line):
+        parsed = parse_recorded_line(line)
+        if parsed is None:
+            return False
+        return self.apply(*parsed)
+
+    def data_age(self):
+        """Seconds since the last message, or None before the first one."""
+        return None if self.updated_at is None else time.time() - self.updated_at
+
+    def snapshot(self):
+        """
+        Returns {'version', 'feed_time', 'updated_at', 'lap', 'total_laps', 'status',
+        'leaderboard', 'tyres', 'weather'}. The frames are shared; don't modify them.
+        """
+        with self._lock:
+            if self._snapshot is not None and self._snapshot['version'] == self.version:
+                return self._snapshot
+            self._snapshot = {
+                'version': self.version,
+                'feed_time': self.feed_time,
+                'updated_at': self.updated_at,
+                'lap': self._data['LapCount'].get('CurrentLap'),
+                'total_laps': self._data['LapCount'].get('TotalLaps'),
+                'status': self._data['SessionStatus'].get('Status'),
+                'leaderboard': self._build_leaderboard(),
+                'tyres': self._build_tyres(),
+                'weather': self._build_weather()
+            }
+            return self._snapshot
+
+    def _build_leaderboard(self):
+        drivers = self._data['DriverList']
+        lines = self._data['TimingData'].get('Lines', {})
+        rows = []
+        for number, line in lines.items():
+            info = drivers.get(number, {})
+            gap = _value(line, 'GapToLeader')
+            lapped = _laps_behind(gap)
+            if line.get('Retired') or line.get('Stopped'):
+                status, code = 'Retired', STATUS_NOT_CLASSIFIED
+            elif lapped:
+                status, code = f"+{lapped} Lap{'s' if lapped > 1 else ''}", STATUS_LAPPED
+            else:
+                status, code = 'In Pit' if line.get('InPit') else 'Running', STATUS_FINISHED
+            rows.append({
+                'Position': int(line.get('Position') or 0),
+                'Abbreviation': info.get('Tla', number),
+                'TeamName': info.get('TeamName', ''),
+                'Time': to_timedelta(_value(line, 'LastLapTime')) if _value(line, 'LastLapTime') else pd.NaT,
+                'Status': status,
+                'StatusCode': code,
+                'Points': 0.0,
+                'GapSeconds': _gap_seconds(gap) if code != STATUS_NOT_CLASSIFIED else np.nan,
+                'IntervalSeconds': _gap_seconds(_value(line, 'IntervalToPositionAhead')) if code == STATUS_FINISHED else np.nan
+            })
+        if not rows:
+            return pd.DataFrame()
+
+        leaderboard = pd.DataFrame(rows).astype({'Position': np.int16, 'StatusCode': np.int8, 'Points': np.float32})
+        order = np.lexsort((leaderboard['Position'].to_numpy(), leaderboard['Position'].to_numpy() == 0))
+        leaderboard = leaderboard.iloc[order].reset_index(drop=True)
+        # The leader's gap field holds the lap count
+        leaderboard.loc[0, 'GapSeconds'] = 0.0
+        leaderboard.loc[0, 'IntervalSeconds'] = np.nan
+        return leaderboard
+
+    def _build_tyres(self):
+        drivers = self._data['DriverList']
+        lines = self._data['TimingAppData'].get('Lines', {})
+        rows = []
+        for number, line in lines.items():
+            stints = line.get('Stints') or []
+            if isinstance(stints, dict):
+                stints = [stints[k] for k in sorted(stints, key=int)]
+            if not stints:
+                continue
+            current = stints[-1]
+            rows.append({
+                'Driver': drivers.get(number, {}).get('Tla', number),
+                'DriverNumber': number,
+                'Compound': current.get('Compound', 'UNKNOWN'),
+                'TyreLife': int(current.get('TotalLaps') or 0),
+                'Stint': len(stints)
+            })
+        return pd.DataFrame(rows, columns=['Driver', 'DriverNumber', 'Compound', 'TyreLife', 'Stint'])
+
+    def _build_weather(self):
+        weather = {}
+        for key, value in self._data['WeatherData'].items():
+            try:
+                weather[key] = float(value)
+            except (TypeError, ValueError):
+                continue
+        return weather
+
+
+class _FeedDriver:
+    """Runs a feed loop (usually into a LiveRaceState) on a daemon thread until stopped."""
+    def __init__(self, state):
+        self.state = state
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self.run, daemon=True, name=type(self).__name__)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def join(self, timeout=None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def run(self):
+        raise NotImplementedError
+
+
+class ReplayDriver(_FeedDriver):
+    """
+    Feeds a recorded live-timing file into a LiveRaceState, paced by the recorded
+    timestamps at `speed` times real time (speed <= 0 replays as fast as possible).
+    Used to exercise live mode offline.
+    """
+    def __init__(self, path, state, speed=1.0):
+        super().__init__(state)
+        self.path = path
+        self.speed = speed
+
+    def run(self):
+        first_time = None
+        started = time.monotonic()
+        with open(self.path, 'r', encoding='utf-8', errors='replace') as f:
+            for line in f:
+                if self._stop.is_set():
+                    return
+                parsed = parse_recorded_line(line)
+                if parsed is None:
+                    continue
+                category, message, timestamp = parsed
+                if timestamp is not None and self.speed > 0:
+                    if first_time is None:
+                        first_time = timestamp
+                    due = (timestamp - first_time).total_seconds() / self.speed
+                    wait = due - (time.monotonic() - started)
+                    if wait > 0 and self._stop.wait(wait):
+                        return
+                self.state.apply(category, message, timestamp)
+        logger.info(f"Replay of {self.path} finished")
+
+
+class FileFollower(_FeedDriver):
+    """
+    Follows a file that the live-timing recorder is still writing, applying lines
+    as they're appended (like tail -f). When the file is truncated (the recorder
+    reconnected) the state is reset and the file is read from the start.
+    """
+    def __init__(self, path, state, poll_interval=0.5):
+        super().__init__(state)
+        self.path = path
+        self.poll_interval = poll_interval
+
+    def run(self):
+        while not os.path.exists(self.path):
+            if self._stop.wait(self.poll_interval):
+                return
+        with open(self.path, 'r', encoding='utf-8', errors='replace') as f:
+            partial = ''
+            while not self._stop.is_set():
+                chunk = f.readline()
+                if not chunk:
+                    if os.path.getsize(self.path) < f.tell():
+                        f.seek(0)
+                        partial = ''
+                        self.state.reset()
+                        continue
+                    self._stop.wait(self.poll_interval)
+                    continue
+                partial += chunk
+                # The recorder may be mid-way through a line
+                if partial.endswith('\n'):
+                    self.state.apply_line(partial)
+                    partial = ''
+
+
+class LiveRecorder(_FeedDriver):
+    """
+    Records the F1 live-timing feed to path with FastF1's SignalRClient, and
+    reconnects whenever the client exits (connection lost, or an error).
+    Every connection starts the file over: the feed sends the full state on
+    subscribe, and appending would mix in earlier sessions' messages.
+    The feed requires F1TV authentication (see README).
+    """
+    def __init__(self, path, restart_delay=RECORDER_RESTART_SECONDS):
+        super().__init__(None)
+        self.path = path
+        self.restart_delay = restart_delay
+        self.connections = 0
+        self._connected = False
+
+    def start(self):
+        # Truncate before any follower opens the file, so it never sees an old recording
+        self._new_file()
+        return super().start()
+
+    @property
+    def running(self):
+        return self._connected
+
+    def _new_file(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        open(self.path, 'w').close()
+
+    def run(self):
+        from fastf1.livetiming.client import SignalRClient
+
+        while not self._stop.is_set():
+            if self.connections:
+                self._new_file()
+            self.connections += 1
+            # timeout=0: stay connected through quiet spells (before the start, red flags)
+            client = SignalRClient(self.path, filemode='a', timeout=0)
+            self._connected = True
+            try:
+                client.start()
+                logger.warning("Live-timing client exited")
+            except Exception as e:
+                logger.error(f"Live-timing client failed: {e}")
+            finally:
+                self._connected = False
+            self._stop.wait(self.restart_delay)
+
+
+_LIVE_STATE = None
+_LIVE_DRIVER = None
+_LIVE_RECORDER = None
+_LIVE_LOCK = threading.Lock()
+
+
+def get_live_state():
+    """
+    Returns the process-wide LiveRaceState, starting its feed on first use,
+    or None when live mode is off.
+    """
+    global _LIVE_STATE, _LIVE_DRIVER, _LIVE_RECORDER
+    if LIVE_MODE not in ("live", "replay"):
+        return None
+    if _LIVE_STATE is None:
+        with _LIVE_LOCK:
+            if _LIVE_STATE is None:
+                state = LiveRaceState()
+                if LIVE_MODE == "replay":
+                    _LIVE_DRIVER = ReplayDriver(LIVE_FILE, state, speed=LIVE_SPEED).start()
+                else:
+                    _LIVE_RECORDER = LiveRecorder(LIVE_FILE).start()
+                    _LIVE_DRIVER = FileFollower(LIVE_FILE, state).start()
+                logger.info(f"Live mode '{LIVE_MODE}' started from {LIVE_FILE}")
+                _LIVE_STATE = state
+    return _LIVE_STATE
+
+
+def live_feed_running():
+    """
+    Whether the live feed is delivering: the recorder is connected (live mode)
+    and the file is being followed or replayed. None when live mode is off.
+    """
+    if _LIVE_STATE is None:
+        return None
+    if _LIVE_RECORDER is not None and not _LIVE_RECORDER.running:
+        return False
+    return _LIVE_DRIVER is not None and _LIVE_DRIVER.running
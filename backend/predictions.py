@@ -0,0 +1,179 @@
+import pandas as pd
+import numpy as np
+import logging
+from backend.caching import ttl_cache
+from backend.data_loader import incremental_table
+from backend.feature_engineering import FeatureEngineer, PIT_STOP_FEATURES
+from models.model_loader import ModelLoader
+from models.strategy_simulator import StrategySimulator
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+_feature_engineer = FeatureEngineer()
+
+@ttl_cache(ttl_seconds=300)
+def get_pit_stop_features(session):
+    """
+    Pit stop features for every driver and lap of the session (see
+    FeatureEngineer.prepare_pit_stop_features). Cached per session version; a new
+    version only recomputes the laps around the ones it added.
+    """
+    if not session:
+        return pd.DataFrame()
+
+    try:
+        weather = session.weather_data
+        return incremental_table(
+            'pit_stop_features', session,
+            lambda laps: _feature_engineer.prepare_pit_stop_features(laps, weather),
+            lambda features, new_laps, first_row: _feature_engineer.update_pit_stop_features(features, session.laps, new_laps, weather)
+        )
+    except Exception as e:
+        logger.error(f"Error building pit stop features: {e}")
+        return pd.DataFrame()
+
+def get_pit_stop_predictions(session):
+    """
+    Probability of each driver pitting at the end of the next lap, scored for the
+    whole grid in one batched predict_proba call on every driver's latest lap.
+    Returns Driver, LapNumber, TireAge, Position, PitProbability; cached per session
+    and model version so switching drivers is a lookup.
+    """
+    return _pit_stop_predictions(session, ModelLoader().model_version('pit_stop'))
+
+@ttl_cache(ttl_seconds=300)
+def _pit_stop_predictions(session, model_version):
+    features = get_pit_stop_features(session)
+    if features.empty:
+        return pd.DataFrame()
+
+    try:
+        latest = features.groupby('Driver', sort=False).tail(1)
+        probabilities = ModelLoader().get_pit_stop_model().predict_proba(latest[PIT_STOP_FEATURES])
+        return pd.DataFrame({
+            'Driver': latest['Driver'].to_numpy(),
+            'LapNumber': latest['LapNumber'].to_numpy(),
+            'TireAge': latest['TireAge'].to_numpy(),
+            'Position': latest['Position'].to_numpy(),
+            'PitProbability': np.asarray(probabilities, dtype=float)
+        }).sort_values('Position', kind='stable').reset_index(drop=True)
+    except Exception as e:
+        logger.error(f"Error predicting pit stops: {e}")
+        return pd.DataFrame()
+
+# Laps of history each pace forecast is based on
+PACE_WINDOW = 5
+
+def build_recent_lap_matrix(laps, window=PACE_WINDOW):
+    """
+    Each driver's last `window` racing laps (in/out laps excluded) as a
+    (drivers x window) array of seconds, oldest first and left-padded with NaN.
+    Returns (drivers, matrix).
+    """
+    racing = laps[laps['PitInTime'].isna() & laps['PitOutTime'].isna() & laps['LapTime'].notna()]
+    drivers = laps['Driver'].unique()
+    matrix = np.full((len(drivers), window), np.nan)
+    if racing.empty:
+        return list(drivers), matrix
+
+    recent = racing.groupby('Driver', sort=False).tail(window)
+    row = pd.Index(drivers).get_indexer(recent['Driver'])
+    # Newest lap goes in the last column
+    col = window - 1 - recent.groupby('Driver', sort=False).cumcount(ascending=False).to_numpy()
+    matrix[row, col] = recent['LapTime'].dt.total_seconds().to_numpy()
+    return list(drivers), matrix
+
+def get_pace_forecast(session, n_laps=5):
+    """
+    Lap time forecast for the next n_laps of every driver, from one batched
+    RacePacePredictor call. Returns a DataFrame indexed by Driver with columns
+    1..n_laps; cached per session and model version.
+    """
+    return _pace_forecast(session, n_laps, ModelLoader().model_version('race_pace'))
+
+@ttl_cache(ttl_seconds=300)
+def _pace_forecast(session, n_laps, model_version):
+    if not session:
+        return pd.DataFrame()
+
+    try:
+        laps = session.laps
+        if laps.empty:
+            return pd.DataFrame()
+        drivers, recent = build_recent_lap_matrix(laps)
+        forecast = ModelLoader().get_race_pace_model().predict_batch(recent, n_laps)
+        return pd.DataFrame(forecast, index=pd.Index(drivers, name='Driver'), columns=range(1, n_laps + 1))
+    except Exception as e:
+        logger.error(f"Error forecasting race pace: {e}")
+        return pd.DataFrame()
+
+def _total_laps(session, laps):
+    try:
+        total = session.total_laps
+        if total:
+            return int(total)
+    except Exception:
+        pass
+    return int(laps['LapNumber'].max())
+
+def get_strategy_simulation(session, from_lap=None, n_simulations=10000):
+    """
+    Monte Carlo simulation of the rest of the race as of the end of from_lap
+    (default: the latest lap), for every driver still running.
+    Pace comes from the batched race pace forecast, tyre wear from the tyre
+    degradation model. Returns StrategySimulator.simulate's result, or None.
+    """
+    models = ModelLoader()
+    model_versions = (models.model_version('race_pace'), models.model_version('tire_deg'))
+    return _strategy_simulation(session, from_lap, n_simulations, model_versions)
+
+@ttl_cache(ttl_seconds=300)
+def _strategy_simulation(session, from_lap, n_simulations, model_versions):
+    if not session:
+        return None
+
+    try:
+        laps = session.laps
+        if laps.empty:
+            return None
+        total_laps = _total_laps(session, laps)
+        from_lap = int(from_lap or laps['LapNumber'].max())
+
+        history = laps[laps['LapNumber'] <= from_lap]
+        current = history.groupby('Driver', sort=False).tail(1)
+        # Drivers who had already stopped running at that point are left out
+        current = current[(current['LapNumber'] >= from_lap - 1) & current['Time'].notna()]
+        if current.empty:
+            return None
+
+        drivers, recent = build_recent_lap_matrix(history)
+        models = ModelLoader()
+        forecast = models.get_race_pace_model().predict_batch(recent, 1)[:, 0]
+        next_lap_pace = pd.Series(forecast, index=drivers).reindex(current['Driver']).to_numpy()
+
+        compounds = current['Compound'].fillna('MEDIUM').to_numpy()
+        tyre_ages = current['TyreLife'].fillna(0).to_numpy(dtype=int)
+        tire_model = models.get_tire_deg_model()
+        # The forecast includes the wear of the current set; the simulator adds wear itself
+        next_laps = current['LapNumber'].to_numpy(dtype=int) + 1
+        wear_now = np.array([
+            tire_model.predict_wear_curve(c, a + 1, 1, current_lap=n)[0]
+            for c, a, n in zip(compounds, tyre_ages, next_laps)
+        ])
+
+        simulator = StrategySimulator(tire_model=tire_model)
+        state = simulator.build_state(
+            current['Driver'].tolist(),
+            current['LapNumber'].to_numpy(dtype=int),
+            total_laps,
+            current['Time'].dt.total_seconds().to_numpy(),
+            compounds,
+            tyre_ages,
+            next_lap_pace - wear_now
+        )
+        return simulator.simulate(state, n_simulations, seed=0)
+    except Exception as e:
+        logger.error(f"Error simulating strategy: {e}")
+        return None
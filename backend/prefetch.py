@@ -0,0 +1,125 @@
+import os
+import threading
+import logging
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+from backend.historical_data import (
+    get_driver_standings_history, get_constructor_standings_history, get_season_races
+)
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# At most this many prefetch requests run at once, so prefetching never crowds out what the user asked for
+PREFETCH_WORKERS = int(os.environ.get("F1DASH_PREFETCH_WORKERS", "2"))
+
+# Seasons either side of the selected one to warm
+PREFETCH_SEASON_RADIUS = 2
+
+FIRST_SEASON = 1950
+
+
+class Prefetcher:
+    """
+    Warms cached functions in the background.
+    Batches belong to an owner (e.g. one browser session). Every call to prefetch()
+    replaces that owner's previous batch: its queued tasks are cancelled, and ones
+    already running finish (their results still land in the cache) but nothing
+    further from that batch starts. Other owners' batches are left alone.
+    """
+    def __init__(self, max_workers=PREFETCH_WORKERS):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="prefetch")
+        self._lock = threading.Lock()
+        # Structure: {owner: (generation, [futures])}
+        self._batches = {}
+
+    def prefetch(self, tasks, owner=None):
+        """
+        Schedules tasks, a list of (func, args) pairs, in order of priority.
+        Returns the generation number of this batch.
+        """
+        with self._lock:
+            generation = self._cancel_locked(owner)
+            # Forget owners whose last batch has finished (e.g. closed browser tabs)
+            self._batches = {
+                o: batch for o, batch in self._batches.items()
+                if not all(f.done() for f in batch[1])
+            }
+            futures = [
+                self._executor.submit(self._run, owner, generation, func, args) for func, args in tasks
+            ]
+            self._batches[owner] = (generation, futures)
+            return generation
+
+    def cancel(self, owner=None):
+        """Cancels every task of owner's batch that hasn't started yet."""
+        with self._lock:
+            generation = self._cancel_locked(owner)
+            self._batches[owner] = (generation, [])
+
+    def pending(self, owner=None):
+        with self._lock:
+            _, futures = self._batches.get(owner, (0, []))
+            return sum(1 for f in futures if not f.done())
+
+    def _cancel_locked(self, owner):
+        generation, futures = self._batches.get(owner, (0, []))
+        for future in futures:
+            future.cancel()
+        return generation + 1
+
+    def _run(self, owner, generation, func, args):
+        if self._batches.get(owner, (None,))[0] != generation:
+            return
+        try:
+            func(*args)
+        except Exception as e:
+            logger.warning(f"Prefetch of {func.__name__}{args} failed: {e}")
+
+
+_PREFETCHER = None
+_PREFETCHER_LOCK = threading.Lock()
+
+
+def get_prefetcher():
+    """Returns the process-wide Prefetcher."""
+    global _PREFETCHER
+    if _PREFETCHER is None:
+        with _PREFETCHER_LOCK:
+            if _PREFETCHER is None:
+                _PREFETCHER = Prefetcher()
+    return _PREFETCHER
+
+
+def adjacent_seasons(year, radius=PREFETCH_SEASON_RADIUS):
+    """Seasons within radius of year, nearest first (year+1 before year-1)."""
+    last_season = datetime.now().year
+    seasons = []
+    for distance in range(1, radius + 1):
+        for season in (year + distance, year - distance):
+            if FIRST_SEASON <= season <= last_season:
+                seasons.append(season)
+    return seasons
+
+
+def _season_tasks(season):
+    return [
+        (get_driver_standings_history, (season,)),
+        (get_constructor_standings_history, (season,)),
+        (get_season_races, (season,)),
+    ]
+
+
+def prefetch_historical(year, owner=None):
+    """
+    Warms the season tables around the season being viewed, the seasons right next
+    to it first. Race classifications are left to be fetched on demand: a season
+    has twenty-odd races, which would use up the API's rate limit fast.
+    Called after the page has rendered; replaces owner's prefetch still queued.
+    """
+    tasks = []
+    for season in adjacent_seasons(int(year)):
+        tasks += _season_tasks(season)
+    return get_prefetcher().prefetch(tasks, owner=owner)
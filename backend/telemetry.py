@@ -0,0 +1,115 @@
+import numpy as np
+import pandas as pd
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Compact column layout for cached telemetry (17 bytes per sample instead of 49).
+# Time is seconds since the first sample, so it fits float32 without losing resolution.
+TELEMETRY_DTYPES = {
+    'Time': np.float32,
+    'Distance': np.float32,
+    'Speed': np.float32,
+    'RPM': np.uint16,
+    'Throttle': np.uint8,
+    'Brake': np.bool_,
+    'Gear': np.int8,
+}
+TELEMETRY_COLUMNS = list(TELEMETRY_DTYPES)
+
+
+def compact_telemetry(telemetry):
+    """
+    Converts a FastF1 telemetry frame into the compact representation.
+    The absolute Date column is replaced by a relative float32 'Time' axis and
+    FastF1's nGear is renamed to Gear. Missing samples become 0 in integer channels.
+    """
+    if telemetry is None or telemetry.empty:
+        return pd.DataFrame({col: pd.Series(dtype=dtype) for col, dtype in TELEMETRY_DTYPES.items()})
+
+    dates = telemetry['Date'].to_numpy(dtype='datetime64[ns]')
+    relative_ns = (dates - dates[0]).astype(np.int64)
+    gear = telemetry['nGear'] if 'nGear' in telemetry.columns else telemetry['Gear']
+
+    return pd.DataFrame({
+        'Time': (relative_ns / 1e9).astype(np.float32),
+        'Distance': telemetry['Distance'].to_numpy(dtype=np.float32),
+        'Speed': telemetry['Speed'].to_numpy(dtype=np.float32),
+        'RPM': np.clip(np.nan_to_num(telemetry['RPM'].to_numpy(dtype=np.float64)), 0, 65535).round().astype(np.uint16),
+        'Throttle': np.clip(np.nan_to_num(telemetry['Throttle'].to_numpy(dtype=np.float64)), 0, 255).round().astype(np.uint8),
+        'Brake': telemetry['Brake'].fillna(False).to_numpy(dtype=bool),
+        'Gear': np.nan_to_num(gear.to_numpy(dtype=np.float64)).astype(np.int8),
+    })
+
+
+def resample_to_grid(traces, channels=('Speed', 'Throttle', 'Brake'), n_points=1000):
+    """
+    Resamples several telemetry traces onto one shared distance grid.
+
+    All traces are laid end to end on a single axis (each shifted by a fixed
+    offset), so every channel is interpolated for all drivers in one np.interp
+    call. Returns (grid, {channel: 2-D array of shape (len(traces), n_points)}).
+    The grid covers only the distance every trace has samples for (FastF1's
+    integrated Distance starts a few metres in), so no driver is extrapolated.
+    """
+    traces = [t for t in traces if t is not None and not t.empty]
+    if not traces:
+        return np.empty(0, dtype=np.float32), {}
+
+    distances = [np.maximum.accumulate(t['Distance'].to_numpy(dtype=np.float64)) for t in traces]
+    start = max(d[0] for d in distances)
+    grid = np.linspace(start, max(start, min(d[-1] for d in distances)), n_points)
+
+    # Each trace gets its own stretch of the combined axis
+    offset = max(d[-1] for d in distances) + 1.0
+    shifts = np.arange(len(traces)) * offset
+    x_all = np.concatenate([d + shift for d, shift in zip(distances, shifts)])
+    x_query = (grid[None, :] + shifts[:, None]).ravel()
+
+    resampled = {}
+    for channel in channels:
+        y_all = np.concatenate([t[channel].to_numpy(dtype=np.float64) for t in traces])
+        resampled[channel] = np.interp(x_query, x_all, y_all).reshape(len(traces), n_points).astype(np.float32)
+    return grid.astype(np.float32), resampled
+
+
+# Throttle at or above this counts as flat out
+FULL_THROTTLE = 98
+
+
+def summarize_lap(telemetry):
+    """
+    Per-lap aggregates of a compact telemetry chunk: max/mean speed,
+    share of lap time at full throttle and the number of braking zones
+    (separate brake applications).
+    """
+    if telemetry.empty:
+        return {'MaxSpeed': np.nan, 'MeanSpeed': np.nan, 'FullThrottlePct': np.nan, 'BrakingZones': 0}
+
+    time = telemetry['Time'].to_numpy(dtype=np.float64)
+    dt = np.diff(time, append=time[-1])
+    total = dt.sum()
+    flat_out = dt[telemetry['Throttle'].to_numpy() >= FULL_THROTTLE].sum()
+
+    brake = telemetry['Brake'].to_numpy(dtype=np.int8)
+    braking_zones = int((np.diff(brake, prepend=0) == 1).sum())
+
+    return {
+        'MaxSpeed': float(telemetry['Speed'].max()),
+        'MeanSpeed': float(telemetry['Speed'].mean()),
+        'FullThrottlePct': float(100.0 * flat_out / total) if total > 0 else np.nan,
+        'BrakingZones': braking_zones
+    }
+
+
+def summarize_laps(chunks):
+    """
+    Consumes (lap_number, telemetry) chunks one at a time and returns a per-lap
+    summary frame. Only the current lap is held in memory.
+    """
+    rows = []
+    for lap_number, telemetry in chunks:
+        rows.append({'LapNumber': lap_number, **summarize_lap(telemetry)})
+    return pd.DataFrame(rows, columns=['LapNumber', 'MaxSpeed', 'MeanSpeed', 'FullThrottlePct', 'BrakingZones'])
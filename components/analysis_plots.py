@@ -9,20 +9,8 @@ def render_driver_comparison(leaderboard_df):
     if leaderboard_df.empty:
         return
 
-    # Convert Gap to numeric for plotting (handle 'Leader' and '+X.Xs')
-    plot_df = leaderboard_df.copy()
-    
-    def parse_gap(x):
-        if x == 'Leader': return 0.0
-        if isinstance(x, str) and x.startswith('+') and x.endswith('s'):
-            try:
-                return float(x[1:-1])
-            except:
-                return None
-        return None
-
-    plot_df['GapNumeric'] = plot_df['Gap'].apply(parse_gap)
-    plot_df = plot_df.dropna(subset=['GapNumeric'])
+    # Gaps are already numeric; drivers without a gap (lapped, retired) are left out
+    plot_df = leaderboard_df.dropna(subset=['GapSeconds'])
     
     # Filter top 10 for readability
     plot_df = plot_df.head(10)
@@ -30,10 +18,10 @@ def render_driver_comparison(leaderboard_df):
     fig = px.bar(
         plot_df, 
         x='Abbreviation', 
-        y='GapNumeric',
+        y='GapSeconds',
         color='TeamName',
         title="Top 10 Gaps to Leader",
-        labels={'GapNumeric': 'Gap (s)', 'Abbreviation': 'Driver'}
+        labels={'GapSeconds': 'Gap (s)', 'Abbreviation': 'Driver'}
     )
     fig.update_layout(template="plotly_dark")
     st.plotly_chart(fig, use_container_width=True)
@@ -58,3 +46,22 @@ def render_team_points(leaderboard_df):
     )
     fig.update_layout(template="plotly_dark")
     st.plotly_chart(fig, use_container_width=True)
+
+def render_long_run_summary(summary_df, driver_code):
+    """
+    Renders per-lap telemetry aggregates (max speed, full throttle %) over a long run.
+    """
+    if summary_df.empty:
+        st.info(f"No lap telemetry for {driver_code}")
+        return
+
+    fig = px.line(
+        summary_df,
+        x='LapNumber',
+        y=['MaxSpeed', 'FullThrottlePct'],
+        markers=True,
+        title=f"Long Run: {driver_code}",
+        labels={'LapNumber': 'Lap', 'value': 'Value', 'variable': 'Metric'}
+    )
+    fig.update_layout(template="plotly_dark")
+    st.plotly_chart(fig, use_container_width=True)
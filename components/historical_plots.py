@@ -62,3 +62,39 @@ def render_race_winners(races_df):
     )
     fig.update_layout(template="plotly_dark")
     st.plotly_chart(fig, use_container_width=True)
+
+def render_career_seasons(career_df, driver_name):
+    """
+    Renders a driver's points and wins per season.
+    """
+    if career_df.empty:
+        st.info("No career data available.")
+        return
+
+    fig = px.bar(
+        career_df,
+        x='Season',
+        y='Points',
+        text='Wins',
+        title=f"{driver_name} - Points per Season (label: wins)",
+        hover_data=['Starts', 'Podiums']
+    )
+    fig.update_layout(template="plotly_dark")
+    st.plotly_chart(fig, use_container_width=True)
+
+def render_position_distribution(positions_df):
+    """
+    Renders how often a driver finished in each position.
+    """
+    if positions_df.empty:
+        return
+
+    fig = px.bar(
+        positions_df,
+        x='Finish',
+        y='Count',
+        title="Finishing Positions",
+        labels={'Finish': 'Position', 'Count': 'Races'}
+    )
+    fig.update_layout(template="plotly_dark", xaxis={'type': 'category'})
+    st.plotly_chart(fig, use_container_width=True)
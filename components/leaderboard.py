@@ -1,5 +1,18 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
+
+def format_gaps(seconds, leaderboard_df, leader_label="Leader"):
+    """
+    Formats numeric gap/interval seconds for display.
+    Returns '+X.XXXs' for classified gaps, leader_label for the leader
+    and the driver's status (e.g. '+1 Lap', 'Retired') otherwise.
+    """
+    seconds = seconds.to_numpy(dtype=float)
+    text = np.char.add(np.char.add('+', np.char.mod('%.3f', np.nan_to_num(seconds))), 's')
+    text = np.where(np.isnan(seconds), leaderboard_df['Status'].to_numpy(dtype=str), text)
+    text[0] = leader_label
+    return text
 
 def render_leaderboard(leaderboard_df):
     """
@@ -11,22 +24,21 @@ def render_leaderboard(leaderboard_df):
 
     st.subheader("Live Leaderboard")
     
-    # Style the dataframe
-    # Highlight the winner, color code gaps
-    
-    def highlight_leader(s):
-        is_leader = s['Position'] == 1
-        return ['background-color: #FFD700; color: black' if is_leader else '' for _ in s]
+    # Format the numeric gap columns for display only; the shared frame stays numeric
+    display_df = leaderboard_df[['Position', 'Abbreviation', 'TeamName', 'Time', 'Status', 'Points']].copy()
+    display_df['Gap'] = format_gaps(leaderboard_df['GapSeconds'], leaderboard_df)
+    display_df['Interval'] = format_gaps(leaderboard_df['IntervalSeconds'], leaderboard_df, leader_label="-")
 
     # Display using st.dataframe with column config
     st.dataframe(
-        leaderboard_df,
+        display_df,
         column_config={
             "Position": st.column_config.NumberColumn("Pos", format="%d"),
             "Abbreviation": "Driver",
             "TeamName": "Team",
             "Time": "Time/Status",
             "Gap": "Gap",
+            "Interval": "Interval",
             "Points": st.column_config.NumberColumn("Pts", format="%.0f"),
         },
         hide_index=True,
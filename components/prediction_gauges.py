@@ -68,3 +68,26 @@ def render_pace_forecast(pace_predictions):
         height=300
     )
     st.plotly_chart(fig, use_container_width=True)
+
+def render_position_distribution(simulation):
+    """
+    Renders a heatmap of each driver's finishing position probabilities.
+    """
+    probabilities = simulation['position_probabilities']
+    positions = list(range(1, probabilities.shape[1] + 1))
+    fig = go.Figure(go.Heatmap(
+        z=probabilities * 100,
+        x=positions,
+        y=simulation['drivers'],
+        colorscale='Viridis',
+        colorbar=dict(title="%")
+    ))
+
+    fig.update_layout(
+        title="Finishing Position Probability",
+        xaxis_title="Position",
+        yaxis=dict(autorange='reversed'),
+        template="plotly_dark",
+        height=max(300, 25 * len(simulation['drivers']))
+    )
+    st.plotly_chart(fig, use_container_width=True)
@@ -1,16 +1,20 @@
 import streamlit as st
 import plotly.graph_objects as go
 import pandas as pd
+from backend.downsampling import select_resolution, points_for_width
 
-def render_telemetry_chart(telemetry_df, driver_code):
+def render_telemetry_chart(telemetry_df, driver_code, levels=None, width_px=700):
     """
     Renders speed and throttle telemetry charts.
+    Traces are downsampled (LTTB) to what a chart of width_px can show, using the
+    precomputed levels from get_telemetry_levels when given.
     """
     if telemetry_df.empty:
         st.info(f"No telemetry data for {driver_code}")
         return
 
     st.subheader(f"Telemetry: {driver_code}")
+    telemetry_df = select_resolution(telemetry_df, levels, points_for_width(width_px))
     
     # Create subplots or separate charts
     # Speed Trace
@@ -57,3 +61,34 @@ def render_telemetry_chart(telemetry_df, driver_code):
         margin=dict(l=20, r=20, t=40, b=20)
     )
     st.plotly_chart(fig_controls, use_container_width=True)
+
+def render_telemetry_comparison(comparison):
+    """
+    Renders overlaid speed and throttle traces for several drivers
+    (output of get_telemetry_comparison).
+    """
+    drivers = comparison.get('drivers', [])
+    if not drivers:
+        st.info("No telemetry data for the selected drivers")
+        return
+
+    distance = comparison['distance']
+    for channel, title, unit in [('Speed', "Speed Comparison", "Speed (km/h)"), ('Throttle', "Throttle Comparison", "Throttle (%)")]:
+        fig = go.Figure()
+        for i, driver in enumerate(drivers):
+            fig.add_trace(go.Scatter(
+                x=distance,
+                y=comparison[channel][i],
+                mode='lines',
+                name=driver,
+                line=dict(width=2)
+            ))
+        fig.update_layout(
+            title=title,
+            xaxis_title="Distance (m)",
+            yaxis_title=unit,
+            template="plotly_dark",
+            height=350,
+            margin=dict(l=20, r=20, t=40, b=20)
+        )
+        st.plotly_chart(fig, use_container_width=True)
@@ -1,6 +1,4 @@
-from models.pit_stop_model import PitStopPredictor
-from models.tire_deg_model import TireDegradationModel
-from models.race_pace_model import RacePacePredictor
+from models.model_registry import ModelRegistry
 import logging
 
 # Configure logging
@@ -8,26 +6,28 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class ModelLoader:
+    """
+    Entry point for the app's predictors. Models are loaded lazily by the shared
+    ModelRegistry, so constructing a ModelLoader is free and new trained versions
+    are picked up without a restart.
+    """
     _instance = None
     
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(ModelLoader, cls).__new__(cls)
-            cls._instance.pit_stop_model = PitStopPredictor()
-            cls._instance.tire_deg_model = TireDegradationModel()
-            cls._instance.race_pace_model = RacePacePredictor()
-            
-            # Load pre-trained models if they exist
-            # cls._instance.pit_stop_model.load()
-            # cls._instance.tire_deg_model.load()
-            
+            cls._instance.registry = ModelRegistry()
         return cls._instance
 
     def get_pit_stop_model(self):
-        return self.pit_stop_model
+        return self.registry.get('pit_stop')
 
     def get_tire_deg_model(self):
-        return self.tire_deg_model
+        return self.registry.get('tire_deg')
 
     def get_race_pace_model(self):
-        return self.race_pace_model
+        return self.registry.get('race_pace')
+
+    def model_version(self, name):
+        """Version of a model currently served (None for built-in inference)."""
+        return self.registry.version(name)
@@ -0,0 +1,143 @@
+import os
+import json
+import time
+import hashlib
+import threading
+import logging
+
+from models.pit_stop_model import PitStopPredictor
+from models.tire_deg_model import TireDegradationModel
+from models.race_pace_model import RacePacePredictor
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Versioned model artifacts written by `python -m models.train_models`
+MODEL_DIR = os.environ.get("F1DASH_MODEL_DIR", "models/artifacts")
+MANIFEST_PATH = os.path.join(MODEL_DIR, "manifest.json")
+
+# How often (seconds) get() looks at the manifest for new versions
+MANIFEST_CHECK_INTERVAL = 5.0
+
+# Artifacts are memory-mapped read-only, so processes serving the same version share pages
+ARTIFACT_MMAP_MODE = "r"
+
+# Predictor class per model name; models without an artifact keep their built-in inference
+MODEL_FACTORIES = {
+    'pit_stop': PitStopPredictor,
+    'tire_deg': TireDegradationModel,
+    'race_pace': RacePacePredictor,
+}
+
+
+def read_manifest(path=None):
+    """Returns {model name: artifact entry} from the manifest, or {} if nothing was trained yet."""
+    try:
+        with open(path or MANIFEST_PATH, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def file_checksum(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ModelRegistry:
+    """
+    Loads predictors lazily, on first get(), in the version the manifest names.
+    Artifacts are checksum-verified and memory-mapped. When the manifest points a
+    model at a new version, the next get() loads it and swaps it in; callers still
+    holding the previous predictor keep using it until they call get() again.
+    """
+    def __init__(self, model_dir=None, check_interval=MANIFEST_CHECK_INTERVAL):
+        self.model_dir = model_dir or MODEL_DIR
+        self.manifest_path = os.path.join(self.model_dir, "manifest.json")
+        self.check_interval = check_interval
+        self._lock = threading.RLock()
+        self._models = {}       # name -> (version, predictor)
+        self._rejected = set()  # (name, version) of artifacts that failed to load
+        self._manifest = {}
+        self._manifest_mtime = None
+        self._checked_at = 0.0
+
+    def get(self, name):
+        """Returns the current predictor for a model name (see MODEL_FACTORIES)."""
+        self._check_manifest()
+        entry = self._manifest.get(name)
+        version = entry['version'] if entry else None
+
+        loaded = self._models.get(name)
+        if loaded is not None and (loaded[0] == version or (name, version) in self._rejected):
+            return loaded[1]
+
+        with self._lock:
+            loaded = self._models.get(name)
+            if loaded is not None and (loaded[0] == version or (name, version) in self._rejected):
+                return loaded[1]
+            predictor = self._load(name, entry)
+            if predictor is None:
+                self._rejected.add((name, version))
+                # Keep serving what we have rather than falling back to mock inference
+                if loaded is not None:
+                    return loaded[1]
+                predictor, version = MODEL_FACTORIES[name](), None
+            self._models[name] = (version, predictor)
+            return predictor
+
+    def version(self, name):
+        """Version of the predictor get(name) returns; None for built-in inference."""
+        self.get(name)
+        return self._models[name][0]
+
+    def versions(self):
+        """Versions of the models loaded so far."""
+        return {name: version for name, (version, _) in self._models.items()}
+
+    def reload(self):
+        """Re-reads the manifest now instead of waiting for the next check."""
+        self._checked_at = 0.0
+        self._manifest_mtime = None
+        self._check_manifest()
+
+    def _check_manifest(self):
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return
+        self._checked_at = now
+        try:
+            mtime = os.stat(self.manifest_path).st_mtime_ns
+        except OSError:
+            mtime = None
+        if mtime == self._manifest_mtime:
+            return
+        with self._lock:
+            self._manifest = read_manifest(self.manifest_path) if mtime is not None else {}
+            self._manifest_mtime = mtime
+
+    def _load(self, name, entry):
+        """Builds a predictor from a manifest entry; None if there's no usable artifact."""
+        if entry is None:
+            return None
+
+        path = os.path.join(self.model_dir, entry['path'])
+        try:
+            checksum = file_checksum(path)
+        except OSError as e:
+            logger.error(f"Artifact for {name} {entry['version']} unreadable: {e}")
+            return None
+        if entry.get('sha256') and checksum != entry['sha256']:
+            logger.error(f"Checksum mismatch for {name} {entry['version']}; not loading {path}")
+            return None
+
+        predictor = MODEL_FACTORIES[name]()
+        predictor.load(path, mmap_mode=ARTIFACT_MMAP_MODE)
+        if not getattr(predictor, 'is_trained', True):
+            return None
+        logger.info(f"Loaded {name} version {entry['version']}")
+        return predictor
@@ -58,10 +58,11 @@ class PitStopPredictor:
         except Exception as e:
             logger.error(f"Error saving model: {e}")
 
-    def load(self, path="models/pit_stop_model.pkl"):
+    def load(self, path="models/pit_stop_model.pkl", mmap_mode=None):
         try:
             if os.path.exists(path):
-                self.model = joblib.load(path)
+                # mmap_mode='r' maps the model's arrays from the file instead of copying them
+                self.model = joblib.load(path, mmap_mode=mmap_mode)
                 self.is_trained = True
                 logger.info(f"Model loaded from {path}")
             else:
@@ -6,6 +6,12 @@ import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Per-lap slowdown added on top of the trend (tyre degradation), in seconds
+DEGRADATION_PER_LAP = 0.05
+
+# Forecast used when a driver has no lap times at all
+DEFAULT_LAP_TIME = 90.0
+
 class RacePacePredictor:
     def __init__(self):
         pass # Simple time series logic for now, no complex model object needed for mock
@@ -15,29 +21,49 @@ class RacePacePredictor:
         Predicts pace for the next n_laps based on recent history.
         recent_lap_times: list or array of recent lap times (seconds)
         """
+        forecast = self.predict_batch(np.asarray([recent_lap_times], dtype=float).reshape(1, -1), n_laps)
+        return forecast[0].tolist()
+
+    def predict_batch(self, recent_laps, n_laps=5):
+        """
+        Predicts pace for the next n_laps of many drivers at once.
+        recent_laps: (drivers x laps) array of recent lap times in seconds, oldest first;
+        NaN marks missing laps (e.g. left-padding for drivers with fewer laps).
+        Returns a (drivers x n_laps) array.
+
+        Each lap adds the driver's average lap-to-lap change (trend) plus a growing
+        degradation term, so lap k (1-based) of the forecast is
+        last + k * trend + DEGRADATION_PER_LAP * k * (k + 1) / 2.
+        Drivers with fewer than 3 laps repeat their last lap.
+        """
         try:
-            if len(recent_lap_times) < 3:
-                # Not enough data, return last known or default
-                last_lap = recent_lap_times[-1] if len(recent_lap_times) > 0 else 90.0
-                return [last_lap] * n_laps
-            
-            # Simple moving average + trend
-            # Calculate trend
-            recent = np.array(recent_lap_times)
-            avg_pace = np.mean(recent)
-            trend = np.mean(np.diff(recent)) # Positive means slowing down
-            
-            predictions = []
-            current_pace = recent[-1]
-            
-            for i in range(n_laps):
-                # Add trend and a bit of noise/degradation
-                next_lap = current_pace + trend + (0.05 * (i+1)) # Assumes slight degradation
-                predictions.append(next_lap)
-                current_pace = next_lap
-                
-            return predictions
-            
+            recent = np.atleast_2d(np.asarray(recent_laps, dtype=float))
+            n_drivers = recent.shape[0]
+            if recent.shape[1] == 0:
+                return np.full((n_drivers, n_laps), DEFAULT_LAP_TIME)
+
+            valid = ~np.isnan(recent)
+            n_valid = valid.sum(axis=1)
+
+            # Last valid lap of each row
+            last_index = recent.shape[1] - 1 - np.argmax(valid[:, ::-1], axis=1)
+            last = np.where(n_valid > 0, recent[np.arange(n_drivers), last_index], DEFAULT_LAP_TIME)
+
+            # Mean lap-to-lap change over consecutive valid laps; positive means slowing down
+            diffs = np.diff(recent, axis=1)
+            diff_valid = ~np.isnan(diffs)
+            trend = np.divide(
+                np.where(diff_valid, diffs, 0.0).sum(axis=1), diff_valid.sum(axis=1),
+                out=np.zeros(n_drivers), where=diff_valid.sum(axis=1) > 0
+            )
+
+            k = np.arange(1, n_laps + 1)
+            forecast = last[:, None] + trend[:, None] * k + DEGRADATION_PER_LAP * k * (k + 1) / 2
+
+            # Not enough data for a trend: repeat the last known lap
+            short = n_valid < 3
+            forecast[short] = last[short, None]
+            return forecast
         except Exception as e:
             logger.error(f"Error predicting race pace: {e}")
-            return [90.0] * n_laps
+            return np.full((len(recent_laps), n_laps), DEFAULT_LAP_TIME)
@@ -0,0 +1,252 @@
+import os
+import threading
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from models.tire_deg_model import TireDegradationModel
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Compounds the simulator knows, in wear-table order
+COMPOUNDS = ['SOFT', 'MEDIUM', 'HARD', 'INTERMEDIATE', 'WET']
+
+# Longest stint a set of each compound can do before it has to come off
+MAX_STINT_LAPS = {'SOFT': 25, 'MEDIUM': 35, 'HARD': 45, 'INTERMEDIATE': 40, 'WET': 40}
+
+# Tyre fitted at the stop, by compound being removed
+NEXT_COMPOUND = {'SOFT': 'HARD', 'MEDIUM': 'HARD', 'HARD': 'MEDIUM', 'INTERMEDIATE': 'INTERMEDIATE', 'WET': 'WET'}
+
+# Time lost to a stop (pit lane + stationary), in seconds: normal(mean, sd)
+PIT_LOSS_MEAN = 22.0
+PIT_LOSS_SD = 1.5
+
+# Random variation in seconds: per-lap noise and a per-run pace offset for each driver
+LAP_NOISE_SD = 0.3
+PACE_SD = 0.2
+
+# Runs per vectorized batch; bounds memory at about runs x drivers x laps floats
+BATCH_RUNS = 1000
+
+# Simulations below this are run in-process; process start-up isn't worth it
+MIN_PARALLEL_SIMULATIONS = 2000
+
+# Pit laps within this many positions of the best expected finish count as the pit window
+PIT_WINDOW_TOLERANCE = 0.25
+
+SIMULATION_WORKERS = int(os.environ.get("F1DASH_SIMULATION_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+
+def build_wear_table(tire_model, max_age, first_lap, last_lap, compounds=COMPOUNDS):
+    """
+    Predicted time loss by compound, stint start lap and tyre age, as a
+    (compounds x start laps x ages) array. A set fitted on lap first_lap + j is
+    at age a on race lap first_lap + j + a, which is the lap the model is given.
+    Compounds not listed are left at zero.
+    """
+    table = np.zeros((len(COMPOUNDS), last_lap - first_lap + 1, max_age))
+    for compound in compounds:
+        i = COMPOUNDS.index(compound)
+        for j, start in enumerate(range(first_lap, last_lap + 1)):
+            table[i, j] = np.asarray(
+                tire_model.predict_wear_curve(compound, 0, laps_to_predict=max_age, current_lap=start), dtype=float)
+    return table
+
+
+def _compound_index(compounds):
+    index = {compound: i for i, compound in enumerate(COMPOUNDS)}
+    # Unknown compounds (e.g. 'UNKNOWN', 'TEST_UNKNOWN') are treated as mediums
+    return np.array([index.get(str(c).upper(), index['MEDIUM']) for c in compounds], dtype=np.int64)
+
+
+def _simulate_shard(state, n_runs, seed):
+    """
+    Simulates n_runs race continuations and returns the counts needed for the
+    summary: finishing position counts (drivers x positions), and the sum of
+    finishing positions and number of runs per driver and pit choice
+    (drivers x (remaining laps + 1), last column = no stop).
+    Runs in worker processes, so it only takes plain arrays.
+    """
+    rng = np.random.default_rng(seed)
+    base = state['base_pace']
+    elapsed = state['elapsed']
+    remaining = state['remaining']
+    age0 = state['tyre_age']
+    compound0 = state['compound']
+    compound1 = state['next_compound']
+    can_skip = state['can_skip_stop']
+    wear = state['wear_table']
+    # Stint start lap of the current set, as an index into the wear table
+    start0 = state['current_lap'] - age0 - state['wear_first_lap']
+
+    n_drivers = len(base)
+    horizon = int(remaining.max()) if n_drivers else 0
+    choices = horizon + 1
+    position_counts = np.zeros((n_drivers, n_drivers), dtype=np.int64)
+    pit_position_sum = np.zeros((n_drivers, choices))
+    pit_runs = np.zeros((n_drivers, choices), dtype=np.int64)
+    if n_drivers == 0:
+        return position_counts, pit_position_sum, pit_runs
+
+    lap = np.arange(1, horizon + 1)                              # laps ahead, 1-based
+    racing = lap[None, :] <= remaining[:, None]                  # (drivers x laps)
+    drivers = np.arange(n_drivers)
+
+    for start in range(0, n_runs, BATCH_RUNS):
+        runs = min(BATCH_RUNS, n_runs - start)
+
+        # Pit lap per run and driver: uniform over the remaining laps but the last, or
+        # no stop for drivers whose tyres can make it to the end
+        options = np.maximum(remaining - 1, 0) + can_skip
+        pit = np.floor(rng.random((runs, n_drivers)) * np.maximum(options, 1)).astype(np.int64) + 1
+        no_stop = pit > remaining - 1
+        pit[no_stop] = horizon + 1
+
+        # Tyre age and compound on every lap, before and after the stop
+        before = lap[None, None, :] <= pit[:, :, None]
+        age = np.where(before, age0[None, :, None] + lap[None, None, :], lap[None, None, :] - pit[:, :, None])
+        compound = np.where(before, compound0[None, :, None], compound1[None, :, None])
+        start = np.where(before, start0[None, :, None], (start0 + age0)[None, :, None] + pit[:, :, None])
+        loss = wear[compound, np.minimum(start, wear.shape[1] - 1), np.minimum(age, wear.shape[2] - 1)]
+
+        lap_times = base[None, :, None] + loss + rng.normal(0.0, LAP_NOISE_SD, loss.shape)
+        lap_times += rng.normal(0.0, PACE_SD, (runs, n_drivers, 1))
+        total = elapsed[None, :] + np.where(racing[None, :, :], lap_times, 0.0).sum(axis=2)
+        total += np.where(no_stop, 0.0, rng.normal(PIT_LOSS_MEAN, PIT_LOSS_SD, (runs, n_drivers)))
+
+        # Finishing position (0-based) of every driver in every run
+        positions = np.argsort(np.argsort(total, axis=1), axis=1)
+        np.add.at(position_counts, (np.broadcast_to(drivers, positions.shape), positions), 1)
+
+        choice = np.where(no_stop, horizon, pit - 1)
+        np.add.at(pit_position_sum, (np.broadcast_to(drivers, choice.shape), choice), positions + 1)
+        np.add.at(pit_runs, (np.broadcast_to(drivers, choice.shape), choice), 1)
+
+    return position_counts, pit_position_sum, pit_runs
+
+
+_POOL = None
+_POOL_LOCK = threading.Lock()
+
+
+def _get_pool():
+    # Started once and reused; worker start-up would otherwise dominate a run.
+    # Workers are never forked from the app process, which runs other threads
+    # (cache sweeper, live feed) whose locks a forked child could inherit held.
+    global _POOL
+    if _POOL is None:
+        with _POOL_LOCK:
+            if _POOL is None:
+                method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+                _POOL = ProcessPoolExecutor(max_workers=SIMULATION_WORKERS,
+                                            mp_context=multiprocessing.get_context(method))
+    return _POOL
+
+
+class StrategySimulator:
+    """
+    Monte Carlo simulation of the rest of a race for the whole field.
+    Each run draws a pit lap per driver, lap times from the race pace baseline plus
+    TireDegradationModel wear and noise, and a pit loss; runs are vectorized with
+    NumPy and split across a process pool.
+    """
+    def __init__(self, tire_model=None, workers=SIMULATION_WORKERS):
+        self.tire_model = tire_model or TireDegradationModel()
+        self.workers = workers
+
+    def build_state(self, drivers, current_lap, total_laps, elapsed, compounds, tyre_ages, base_pace):
+        """
+        Packs the race state into plain arrays for the workers.
+        base_pace: each driver's expected lap time on fresh tyres (seconds).
+        elapsed: race time at the end of each driver's current lap (seconds).
+        """
+        compounds = [str(c).upper() for c in compounds]
+        current_lap = np.asarray(current_lap, dtype=np.int64)
+        remaining = np.maximum(int(total_laps) - current_lap, 0)
+        tyre_age = np.asarray(tyre_ages, dtype=np.int64)
+        max_stint = np.array([MAX_STINT_LAPS.get(c, MAX_STINT_LAPS['MEDIUM']) for c in compounds])
+        max_age = int(tyre_age.max(initial=0) + remaining.max(initial=0) + 1)
+        first_lap = int((current_lap - tyre_age).min()) if len(current_lap) else 0
+        compound0 = _compound_index(compounds)
+        compound1 = _compound_index([NEXT_COMPOUND.get(c, 'HARD') for c in compounds])
+        used = [COMPOUNDS[i] for i in np.union1d(compound0, compound1)]
+
+        return {
+            'drivers': list(drivers),
+            'current_lap': current_lap,
+            'total_laps': int(total_laps),
+            'base_pace': np.asarray(base_pace, dtype=float),
+            'elapsed': np.asarray(elapsed, dtype=float),
+            'remaining': remaining,
+            'tyre_age': tyre_age,
+            'compound': compound0,
+            'next_compound': compound1,
+            'can_skip_stop': (tyre_age + remaining <= max_stint).astype(np.int64),
+            'wear_table': build_wear_table(self.tire_model, max(max_age, 2), first_lap, max(int(total_laps), first_lap), used),
+            'wear_first_lap': first_lap
+        }
+
+    def simulate(self, state, n_simulations=10000, seed=None):
+        """
+        Runs n_simulations continuations from state (see build_state).
+        Returns {'drivers', 'position_probabilities' (drivers x positions),
+        'expected_position', 'pit_windows' (DataFrame)}.
+        """
+        seeds = np.random.SeedSequence(seed)
+        workers = self.workers if n_simulations >= MIN_PARALLEL_SIMULATIONS else 1
+        shards = [n_simulations // workers + (1 if i < n_simulations % workers else 0) for i in range(workers)]
+        shard_seeds = seeds.spawn(len(shards))
+
+        if workers > 1:
+            try:
+                futures = [_get_pool().submit(_simulate_shard, state, n, s) for n, s in zip(shards, shard_seeds)]
+                results = [f.result() for f in futures]
+            except Exception as e:
+                logger.warning(f"Parallel simulation failed, running in-process: {e}")
+                results = [_simulate_shard(state, n, s) for n, s in zip(shards, shard_seeds)]
+        else:
+            results = [_simulate_shard(state, n, s) for n, s in zip(shards, shard_seeds)]
+
+        position_counts = sum(r[0] for r in results)
+        pit_position_sum = sum(r[1] for r in results)
+        pit_runs = sum(r[2] for r in results)
+        return self._summarize(state, position_counts, pit_position_sum, pit_runs, n_simulations)
+
+    def _summarize(self, state, position_counts, pit_position_sum, pit_runs, n_simulations):
+        drivers = state['drivers']
+        probabilities = position_counts / max(n_simulations, 1)
+        expected = probabilities @ np.arange(1, len(drivers) + 1) if len(drivers) else np.array([])
+
+        # Mean finishing position for each pit choice; choices never drawn are excluded
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean_position = np.where(pit_runs > 0, pit_position_sum / pit_runs, np.nan)
+
+        horizon = mean_position.shape[1] - 1
+        windows = []
+        for i, driver in enumerate(drivers):
+            row = mean_position[i]
+            if np.isnan(row).all():
+                windows.append({'Driver': driver, 'BestPitLap': None, 'WindowStart': None, 'WindowEnd': None, 'ExpectedPosition': expected[i]})
+                continue
+            best = int(np.nanargmin(row))
+            good = np.flatnonzero(row[:horizon] <= row[best] + PIT_WINDOW_TOLERANCE)
+            lap_of = lambda choice: int(state['current_lap'][i] + choice + 1)
+            windows.append({
+                'Driver': driver,
+                'BestPitLap': None if best == horizon else lap_of(best),
+                'WindowStart': lap_of(good.min()) if good.size else None,
+                'WindowEnd': lap_of(good.max()) if good.size else None,
+                'ExpectedPosition': expected[i]
+            })
+
+        return {
+            'drivers': drivers,
+            'position_probabilities': probabilities,
+            'expected_position': expected,
+            'pit_windows': pd.DataFrame(windows)
+        }
@@ -4,6 +4,7 @@ from sklearn.linear_model import LinearRegression
 import joblib
 import os
 import logging
+from backend.feature_engineering import FeatureEngineer
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -27,11 +28,26 @@ class TireDegradationModel:
         except Exception as e:
             logger.error(f"Error training TireDegradationModel: {e}")
 
-    def predict_wear_curve(self, compound, current_age, laps_to_predict=20):
+    def predict_wear_curve(self, compound, current_age, laps_to_predict=20, current_lap=None):
         """
         Predicts lap time degradation for the next N laps.
         Returns a list of predicted time loss (seconds) per lap.
+        current_lap is only used by a trained model (defaults to the tyre age).
         """
+        if self.is_trained:
+            try:
+                future_laps = np.arange(current_age, current_age + laps_to_predict)
+                start_lap = current_age if current_lap is None else current_lap
+                laps = pd.DataFrame({
+                    'Compound': compound,
+                    'TyreLife': future_laps,
+                    'LapNumber': start_lap + future_laps - current_age
+                })
+                features = FeatureEngineer().prepare_tire_deg_features(laps)
+                return np.clip(self.model.predict(features), 0, None)
+            except Exception as e:
+                logger.error(f"Error predicting tyre wear: {e}")
+
         # Mock logic for demo
         # Softs degrade faster, Hards slower
         base_degradation = 0.05 # seconds per lap
@@ -59,10 +75,11 @@ class TireDegradationModel:
         except Exception as e:
             logger.error(f"Error saving model: {e}")
 
-    def load(self, path="models/tire_deg_model.pkl"):
+    def load(self, path="models/tire_deg_model.pkl", mmap_mode=None):
         try:
             if os.path.exists(path):
-                self.model = joblib.load(path)
+                # mmap_mode='r' maps the model's arrays from the file instead of copying them
+                self.model = joblib.load(path, mmap_mode=mmap_mode)
                 self.is_trained = True
                 logger.info(f"Model loaded from {path}")
             else:
@@ -0,0 +1,285 @@
+"""
+Trains the pit stop and tyre degradation models from historical sessions.
+
+Lap-level datasets are extracted in parallel (one session per worker process)
+into a Parquet training store, then the models are fitted out-of-core with
+partial_fit, one Parquet file at a time. Each run writes a new artifact version
+and points models/artifacts/manifest.json at it; the app loads what the
+manifest names.
+
+Usage:
+    python -m models.train_models --from 2021 --to 2023
+    python -m models.train_models --from 2023 --to 2023 --workers 2 --force
+    python -m models.train_models --train-only
+"""
+import os
+import json
+import time
+import argparse
+import logging
+from datetime import datetime, timezone
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+import joblib
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sklearn.linear_model import SGDClassifier, SGDRegressor
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from backend.feature_engineering import FeatureEngineer, PIT_STOP_FEATURES
+from models.model_registry import MODEL_DIR, MANIFEST_PATH, read_manifest, file_checksum
+
+logger = logging.getLogger(__name__)
+
+# Parquet training store: {TRAINING_DATA_DIR}/{dataset}/{year}_{round:02d}.parquet
+TRAINING_DATA_DIR = os.environ.get("F1DASH_TRAINING_DATA_DIR", "models/training_data")
+
+TIRE_DEG_FEATURES = ['Compound_Encoded', 'TyreLife', 'LapNumber']
+
+# Rows per partial_fit call
+BATCH_ROWS = 50_000
+
+# Passes over the training store for the SGD learners
+EPOCHS = 3
+
+
+def tire_deg_dataset(laps, feature_engineer):
+    """
+    Tyre degradation training rows: the tyre features of every racing lap and
+    TimeLoss, its lap time minus the driver's best lap of that stint.
+    """
+    racing = laps[
+        laps['PitInTime'].isna() & laps['PitOutTime'].isna()
+        & laps['LapTime'].notna() & laps['Compound'].notna() & laps['TyreLife'].notna()
+    ]
+    if racing.empty:
+        return pd.DataFrame()
+
+    lap_seconds = racing['LapTime'].dt.total_seconds()
+    stint_best = lap_seconds.groupby([racing['Driver'], racing['Stint']]).transform('min')
+    features = feature_engineer.prepare_tire_deg_features(racing)
+    if features.empty:
+        return pd.DataFrame()
+    features['TimeLoss'] = (lap_seconds - stint_best).to_numpy()
+    return features
+
+
+def store_path(dataset, year, round_number):
+    return os.path.join(TRAINING_DATA_DIR, dataset, f"{year}_{round_number:02d}.parquet")
+
+
+def checkpoint_path(year, round_number):
+    """Marks a session as extracted, including ones that produced no rows for a dataset."""
+    return os.path.join(TRAINING_DATA_DIR, "_extracted", f"{year}_{round_number:02d}.json")
+
+
+def _write_parquet(df, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    pq.write_table(pa.Table.from_pandas(df, preserve_index=False), tmp_path)
+    os.replace(tmp_path, path)
+
+
+def extract_session(year, round_number, force=False):
+    """
+    Loads one race with FastF1 and writes its pit stop and tyre degradation rows
+    to the training store. Runs in a worker process.
+    Returns {dataset: rows written}; sessions already extracted are skipped.
+    """
+    import fastf1
+    from backend.data_loader import FASTF1_CACHE_DIR
+
+    paths = {name: store_path(name, year, round_number) for name in ('pit_stop', 'tire_deg')}
+    checkpoint = checkpoint_path(year, round_number)
+    if not force and (os.path.exists(checkpoint) or all(os.path.exists(p) for p in paths.values())):
+        return {name: 0 for name in paths}
+
+    os.makedirs(FASTF1_CACHE_DIR, exist_ok=True)
+    fastf1.Cache.enable_cache(FASTF1_CACHE_DIR)
+    session = fastf1.get_session(year, round_number, 'R')
+    session.load(laps=True, telemetry=False, weather=True, messages=False)
+
+    feature_engineer = FeatureEngineer()
+    datasets = {
+        'pit_stop': feature_engineer.prepare_pit_stop_features(session.laps, session.weather_data),
+        'tire_deg': tire_deg_dataset(session.laps, feature_engineer)
+    }
+
+    written = {}
+    for name, df in datasets.items():
+        if df.empty:
+            # Don't leave rows from an earlier extraction of this session behind
+            if os.path.exists(paths[name]):
+                os.remove(paths[name])
+            written[name] = 0
+            continue
+        df = df.assign(Year=year, Round=round_number)
+        _write_parquet(df, paths[name])
+        written[name] = len(df)
+
+    # Written last, so a session interrupted half way is extracted again
+    os.makedirs(os.path.dirname(checkpoint), exist_ok=True)
+    with open(checkpoint, "w", encoding="utf-8") as f:
+        json.dump(written, f)
+    return written
+
+
+def list_races(first_year, last_year):
+    """(year, round) of every race in the range that has already taken place."""
+    import fastf1
+
+    races = []
+    now = pd.Timestamp.now()
+    for year in range(first_year, last_year + 1):
+        try:
+            schedule = fastf1.get_event_schedule(year, include_testing=False)
+        except Exception as e:
+            logger.error(f"Could not load the {year} schedule: {e}")
+            continue
+        past = schedule[schedule['EventDate'] < now]
+        races += [(year, int(r)) for r in past['RoundNumber']]
+    return races
+
+
+def extract(races, workers=4, force=False):
+    """Extracts sessions in a process pool. Returns {(year, round): {dataset: rows}}."""
+    extracted = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(extract_session, year, rnd, force): (year, rnd) for year, rnd in races}
+        for future in as_completed(futures):
+            race = futures[future]
+            try:
+                extracted[race] = future.result()
+                logger.info(f"Extracted {race[0]} round {race[1]}: {extracted[race]}")
+            except Exception as e:
+                logger.error(f"Failed to extract {race[0]} round {race[1]}: {e}")
+    return extracted
+
+
+def iter_batches(dataset, columns, batch_rows=BATCH_ROWS):
+    """Streams a dataset from the training store as DataFrames of at most batch_rows rows."""
+    directory = os.path.join(TRAINING_DATA_DIR, dataset)
+    if not os.path.isdir(directory):
+        return
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith(".parquet"):
+            continue
+        parquet = pq.ParquetFile(os.path.join(directory, name))
+        for batch in parquet.iter_batches(batch_size=batch_rows, columns=columns):
+            yield batch.to_pandas().dropna()
+
+
+def fit_out_of_core(dataset, features, target, model, epochs=EPOCHS, classes=None):
+    """
+    Fits a StandardScaler + SGD model pipeline without holding the dataset in memory:
+    one pass to fit the scaler (and count labels), then `epochs` passes of partial_fit.
+    Returns (pipeline, rows per epoch), or (None, 0) if the dataset is empty.
+    """
+    scaler = StandardScaler()
+    n_rows = 0
+    label_counts = {}
+    for batch in iter_batches(dataset, features + [target]):
+        if batch.empty:
+            continue
+        scaler.partial_fit(batch[features])
+        n_rows += len(batch)
+        if classes is not None:
+            for label, count in batch[target].value_counts().items():
+                label_counts[label] = label_counts.get(label, 0) + count
+
+    if n_rows == 0:
+        return None, 0
+
+    if classes is not None:
+        # Pit laps are rare; weight classes inversely to their frequency
+        model.set_params(class_weight={
+            c: n_rows / (len(classes) * label_counts.get(c, 1)) for c in classes
+        })
+
+    for _ in range(epochs):
+        for batch in iter_batches(dataset, features + [target]):
+            if batch.empty:
+                continue
+            X = scaler.transform(batch[features])
+            if classes is not None:
+                model.partial_fit(X, batch[target].to_numpy(), classes=classes)
+            else:
+                model.partial_fit(X, batch[target].to_numpy())
+
+    return Pipeline([('scaler', scaler), ('model', model)]), n_rows
+
+
+def publish(name, pipeline, version, n_rows, features):
+    """
+    Writes a model artifact to {MODEL_DIR}/{name}/{version}/model.joblib and
+    points the manifest at it.
+    """
+    directory = os.path.join(MODEL_DIR, name, version)
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, "model.joblib")
+    joblib.dump(pipeline, path)
+
+    manifest = read_manifest()
+    manifest[name] = {
+        'version': version,
+        'path': os.path.relpath(path, MODEL_DIR),
+        'sha256': file_checksum(path),
+        'trained_at': time.time(),
+        'rows': int(n_rows),
+        'features': features
+    }
+    tmp_path = f"{MANIFEST_PATH}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, MANIFEST_PATH)
+    logger.info(f"Published {name} {version} ({n_rows} rows) to {path}")
+
+
+def train(version=None):
+    """Fits both models from the training store and publishes them. Returns the version."""
+    version = version or datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+    pit_model, pit_rows = fit_out_of_core(
+        'pit_stop', PIT_STOP_FEATURES, 'PitNextLap',
+        SGDClassifier(loss='log_loss', alpha=1e-4, random_state=0), classes=np.array([0, 1])
+    )
+    if pit_model is not None:
+        publish('pit_stop', pit_model, version, pit_rows, PIT_STOP_FEATURES)
+    else:
+        logger.warning("No pit stop training data; pit stop model not trained.")
+
+    deg_model, deg_rows = fit_out_of_core(
+        'tire_deg', TIRE_DEG_FEATURES, 'TimeLoss',
+        SGDRegressor(alpha=1e-4, random_state=0)
+    )
+    if deg_model is not None:
+        publish('tire_deg', deg_model, version, deg_rows, TIRE_DEG_FEATURES)
+    else:
+        logger.warning("No tyre degradation training data; tyre model not trained.")
+    return version
+
+
+def main(argv=None):
+    current_year = datetime.now().year
+    parser = argparse.ArgumentParser(description="Extract training data from historical races and train the models.")
+    parser.add_argument("--from", dest="first_year", type=int, default=current_year - 1)
+    parser.add_argument("--to", dest="last_year", type=int, default=current_year)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Sessions extracted in parallel")
+    parser.add_argument("--force", action="store_true", help="Re-extract sessions already in the training store")
+    parser.add_argument("--train-only", action="store_true", help="Skip extraction and train on the existing store")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    if not args.train_only:
+        races = list_races(args.first_year, args.last_year)
+        extracted = extract(races, workers=args.workers, force=args.force)
+        logger.info(f"Extracted {len(extracted)} of {len(races)} races into {TRAINING_DATA_DIR}")
+    version = train()
+    logger.info(f"Done: model version {version}, manifest {MANIFEST_PATH}")
+
+
+if __name__ == "__main__":
+    main()
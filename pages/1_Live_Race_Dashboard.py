@@ -1,8 +1,9 @@
 import streamlit as st
 import pandas as pd
-from backend.data_loader import load_current_session, get_live_leaderboard, get_session_metadata, get_car_telemetry, get_live_tyre_data
+from backend.data_loader import load_current_session, get_live_leaderboard, get_session_metadata, get_car_telemetry, get_live_tyre_data, get_session_data_age, get_telemetry_levels, get_telemetry_comparison
+from backend.live_timing import get_live_state, live_feed_running
 from components.leaderboard import render_leaderboard
-from components.telemetry_charts import render_telemetry_chart
+from components.telemetry_charts import render_telemetry_chart, render_telemetry_comparison
 import time
 
 st.set_page_config(page_title="Live Race Dashboard", layout="wide")
@@ -17,6 +18,25 @@ if not session:
     st.error("Failed to load session data. Please try again later.")
     st.stop()
 
+# With live mode on, leaderboard and tyres come from the live-timing feed instead of the session
+live_state = get_live_state()
+
+# Only the leaderboard and tyre panels rerun on this timer; the rest of the page
+# reruns when the user interacts with it or the session gets new laps
+REFRESH_SECONDS = 5 if live_state is not None else 60
+
+# Telemetry charts are drawn for this session version; a newer one triggers a full rerun
+st.session_state['rendered_version'] = getattr(session, 'data_version', 0)
+
+def current_session():
+    # Cached, and served stale while a reload runs in the background
+    return load_current_session() or session
+
+def current_leaderboard(live):
+    if live is not None and not live['leaderboard'].empty:
+        return live['leaderboard']
+    return get_live_leaderboard(current_session())
+
 # Metadata
 metadata = get_session_metadata(session)
 col1, col2, col3, col4 = st.columns(4)
@@ -25,31 +45,75 @@ col2.metric("Session", metadata.get('session_name', 'Unknown'))
 col3.metric("Track Temp", f"{metadata.get('track_temp', 0):.1f} °C")
 col4.metric("Air Temp", f"{metadata.get('air_temp', 0):.1f} °C")
 
+@st.fragment(run_every=REFRESH_SECONDS)
+def leaderboard_panel():
+    live = live_state.snapshot() if live_state is not None else None
+
+    # New laps since the charts were drawn: redraw the whole page once
+    if getattr(current_session(), 'data_version', 0) != st.session_state.get('rendered_version'):
+        st.rerun()
+
+    data_age = live_state.data_age() if live_state is not None else get_session_data_age()
+    if live_feed_running() is False:
+        st.warning("Live timing feed is not connected (reconnecting); showing the last data received.")
+    if live is not None and live['lap']:
+        st.caption(f"Live timing: lap {live['lap']}/{live['total_laps'] or '?'}")
+    if data_age is not None:
+        st.caption(f"Data age: {int(data_age // 60)} min {int(data_age % 60)} s")
+
+    render_leaderboard(current_leaderboard(live))
+
+@st.fragment(run_every=REFRESH_SECONDS)
+def tyre_panel(selected_driver):
+    live = live_state.snapshot() if live_state is not None else None
+    tyre_data = live['tyres'] if live is not None and not live['tyres'].empty else get_live_tyre_data(current_session())
+    if not tyre_data.empty:
+        driver_tyre = tyre_data[tyre_data['Driver'] == selected_driver]
+        if not driver_tyre.empty:
+            st.info(f"Current Tyre: {driver_tyre.iloc[0]['Compound']} (Age: {driver_tyre.iloc[0]['TyreLife']} laps)")
+
+@st.fragment
+def telemetry_panel(drivers):
+    # Changing the driver reruns only this panel
+    selected_driver = st.selectbox("Select Driver", drivers, key='telemetry_driver')
+    if selected_driver:
+        telemetry = get_car_telemetry(session, selected_driver)
+        levels = get_telemetry_levels(session, selected_driver)
+        render_telemetry_chart(telemetry, selected_driver, levels=levels)
+        # Nested so a new selection redraws the tyre info at once; its own timer keeps it current
+        tyre_panel(selected_driver)
+
+@st.fragment
+def comparison_panel(drivers):
+    compare_drivers = st.multiselect("Compare Drivers", drivers, default=drivers[:3])
+    if compare_drivers:
+        comparison = get_telemetry_comparison(session, tuple(compare_drivers))
+        render_telemetry_comparison(comparison)
+
+# Driver lists only change with the session, not on every refresh
+leaderboard = get_live_leaderboard(session)
+drivers = leaderboard['Abbreviation'].tolist() if not leaderboard.empty else []
+
 # Layout: Leaderboard (Left) | Telemetry & Details (Right)
 col_left, col_right = st.columns([1, 1])
 
 with col_left:
-    leaderboard = get_live_leaderboard(session)
-    render_leaderboard(leaderboard)
+    leaderboard_panel()
 
 with col_right:
     st.subheader("Driver Telemetry")
-    
-    if not leaderboard.empty:
-        drivers = leaderboard['Abbreviation'].tolist()
-        selected_driver = st.selectbox("Select Driver", drivers)
-        
-        if selected_driver:
-            telemetry = get_car_telemetry(session, selected_driver)
-            render_telemetry_chart(telemetry, selected_driver)
-            
-            # Tyre Info
-            tyre_data = get_live_tyre_data(session)
-            if not tyre_data.empty:
-                driver_tyre = tyre_data[tyre_data['Driver'] == selected_driver]
-                if not driver_tyre.empty:
-                    st.info(f"Current Tyre: {driver_tyre.iloc[0]['Compound']} (Age: {driver_tyre.iloc[0]['TyreLife']} laps)")
-
-# Auto-refresh logic (optional, Streamlit reruns on interaction usually)
+
+    if drivers:
+        telemetry_panel(drivers)
+
+# Multi-driver overlay on a common distance grid
+if drivers:
+    st.subheader("Fastest Lap Comparison")
+    comparison_panel(drivers)
+
+# Drawing the charts may have loaded laps, which sets the version they show
+st.session_state['rendered_version'] = getattr(session, 'data_version', 0)
+
+# Full reload of every panel
 if st.button("Refresh Data"):
     st.rerun()
@@ -1,10 +1,9 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
 from backend.data_loader import load_current_session, get_live_leaderboard, get_live_tyre_data
-from backend.feature_engineering import FeatureEngineer
+from backend.predictions import get_pit_stop_predictions, get_pace_forecast, get_strategy_simulation
 from models.model_loader import ModelLoader
-from components.prediction_gauges import render_pit_stop_gauge, render_tire_wear_chart, render_pace_forecast
+from components.prediction_gauges import render_pit_stop_gauge, render_tire_wear_chart, render_pace_forecast, render_position_distribution
 
 st.set_page_config(page_title="Race Predictions", layout="wide")
 
@@ -13,7 +12,6 @@ st.title("🔮 AI Race Predictions")
 # Load Session & Models
 session = load_current_session()
 model_loader = ModelLoader()
-fe = FeatureEngineer()
 
 if not session:
     st.error("No active session found.")
@@ -34,40 +32,39 @@ if selected_driver:
     # Pit Stop Prediction
     with col1:
         st.subheader("Pit Stop Probability (Next Lap)")
-        # Prepare features (mocked for now)
-        # In real app, we'd get actual telemetry for this driver
-        pit_features = fe.prepare_pit_stop_features(None, None, None) 
-        
-        # Get model
-        pit_model = model_loader.get_pit_stop_model()
-        
-        # Predict
-        # We need to pass a single sample, let's just use the first row of our mock features
-        if not pit_features.empty:
-            # Add some randomness based on driver for demo variety
-            driver_seed = sum(ord(c) for c in selected_driver)
-            np.random.seed(driver_seed)
-            
-            # Mock input: modify tire age based on random seed
-            mock_input = pit_features.iloc[[0]].copy()
-            mock_input['TireAge'] = np.random.randint(5, 30)
-            
-            prob = pit_model.predict_proba(mock_input)[0]
-            render_pit_stop_gauge(prob)
+        # Scored for the whole grid at once and cached per session version
+        pit_predictions = get_pit_stop_predictions(session)
+        driver_pit = pit_predictions[pit_predictions['Driver'] == selected_driver] if not pit_predictions.empty else pit_predictions
+
+        if not driver_pit.empty:
+            render_pit_stop_gauge(driver_pit.iloc[0]['PitProbability'])
+            st.caption(f"Lap {int(driver_pit.iloc[0]['LapNumber'])}, tyres {int(driver_pit.iloc[0]['TireAge'])} laps old")
+
+            with st.expander("Whole Grid"):
+                st.dataframe(
+                    pit_predictions,
+                    column_config={
+                        "PitProbability": st.column_config.ProgressColumn("Pit Probability", min_value=0.0, max_value=1.0, format="%.2f")
+                    },
+                    hide_index=True,
+                    use_container_width=True
+                )
         else:
             st.warning("Could not generate features.")
 
     # Race Pace Forecast
     with col2:
         st.subheader("Race Pace Forecast (Next 5 Laps)")
-        pace_model = model_loader.get_race_pace_model()
-        
-        # Mock recent lap times
-        # In real app, get from session.laps
-        recent_laps = [90.0, 90.2, 89.8, 90.5, 90.1] 
-        predictions = pace_model.predict_next_laps(recent_laps)
-        
-        render_pace_forecast(predictions)
+        # Forecast for the whole field from the session's laps, cached per session version
+        pace_forecast = get_pace_forecast(session)
+        if not pace_forecast.empty and selected_driver in pace_forecast.index:
+            predictions = pace_forecast.loc[selected_driver].tolist()
+        else:
+            predictions = []
+        if predictions:
+            render_pace_forecast(predictions)
+        else:
+            st.warning("No lap times available for a forecast.")
 
     # Tire Degradation
     st.subheader("Tire Degradation Curve")
@@ -82,5 +79,41 @@ if selected_driver:
             current_age = d_data.iloc[0]['TyreLife']
     
     deg_model = model_loader.get_tire_deg_model()
-    wear_curve = deg_model.predict_wear_curve(current_compound, current_age)
+    current_lap = int(driver_pit.iloc[0]['LapNumber']) if not driver_pit.empty else None
+    wear_curve = deg_model.predict_wear_curve(current_compound, current_age, current_lap=current_lap)
     render_tire_wear_chart(wear_curve)
+
+# Strategy Simulation
+st.markdown("---")
+st.subheader("Race Strategy Simulation")
+laps = session.laps
+if not laps.empty and laps['LapNumber'].max() > 1:
+    last_lap = int(laps['LapNumber'].max())
+    from_lap = st.slider("Simulate from lap", 1, last_lap, last_lap)
+    n_simulations = st.select_slider("Simulations", options=[1000, 5000, 10000, 20000], value=10000)
+
+    if st.checkbox("Run simulation", value=False):
+        with st.spinner(f"Simulating {n_simulations} race continuations..."):
+            simulation = get_strategy_simulation(session, from_lap, n_simulations)
+
+        if simulation is not None:
+            col1, col2 = st.columns([2, 1])
+            with col1:
+                render_position_distribution(simulation)
+            with col2:
+                st.dataframe(
+                    simulation['pit_windows'].sort_values('ExpectedPosition'),
+                    column_config={
+                        "BestPitLap": st.column_config.NumberColumn("Best Pit Lap", format="%d"),
+                        "WindowStart": st.column_config.NumberColumn("Window From", format="%d"),
+                        "WindowEnd": st.column_config.NumberColumn("Window To", format="%d"),
+                        "ExpectedPosition": st.column_config.NumberColumn("Exp. Pos", format="%.1f")
+                    },
+                    hide_index=True,
+                    use_container_width=True
+                )
+                st.caption("Best Pit Lap is empty when not stopping again is best.")
+        else:
+            st.warning("Could not simulate from this lap.")
+else:
+    st.info("Not enough laps to simulate.")
@@ -1,6 +1,6 @@
 import streamlit as st
-from backend.data_loader import load_current_session, get_live_leaderboard
-from components.analysis_plots import render_driver_comparison, render_team_points
+from backend.data_loader import load_current_session, get_live_leaderboard, get_lap_telemetry_summary, STATUS_FINISHED
+from components.analysis_plots import render_driver_comparison, render_team_points, render_long_run_summary
 
 st.set_page_config(page_title="Race Insights", layout="wide")
 
@@ -27,4 +27,14 @@ st.markdown("---")
 st.subheader("Session Statistics")
 if not leaderboard.empty:
     st.metric("Total Drivers", len(leaderboard))
-    st.metric("Finishers", len(leaderboard[leaderboard['Status'] == 'Finished']))
+    st.metric("Finishers", int((leaderboard['StatusCode'] == STATUS_FINISHED).sum()))
+
+st.markdown("---")
+st.subheader("Long Run Analysis")
+if not leaderboard.empty:
+    long_run_driver = st.selectbox("Driver", leaderboard['Abbreviation'].tolist())
+    # Streams every lap's telemetry, so only run it when asked
+    if st.checkbox("Analyze full race telemetry"):
+        with st.spinner("Streaming lap telemetry..."):
+            summary = get_lap_telemetry_summary(session, long_run_driver)
+        render_long_run_summary(summary, long_run_driver)
@@ -1,8 +1,13 @@
 import streamlit as st
 import pandas as pd
-from backend.historical_data import get_driver_standings_history, get_constructor_standings_history, get_season_races
-from components.historical_plots import render_season_progress, render_constructor_progress, render_race_winners
+from backend.historical_data import get_season_overview, get_race_results, get_driver_career_stats, get_driver_position_distribution
+from backend.prefetch import prefetch_historical
+from components.historical_plots import (
+    render_season_progress, render_constructor_progress, render_race_winners,
+    render_career_seasons, render_position_distribution
+)
 import datetime
+import uuid
 
 st.set_page_config(page_title="Historical Data", layout="wide")
 
@@ -15,13 +20,16 @@ selected_year = st.sidebar.selectbox("Select Season", range(current_year, 1950,
 st.sidebar.markdown("---")
 st.sidebar.info(f"Viewing data for the {selected_year} season.")
 
+# Fetch all three datasets for the season in parallel
+with st.spinner(f"Fetching {selected_year} season data..."):
+    overview = get_season_overview(selected_year)
+
 # Tabs
-tab1, tab2, tab3 = st.tabs(["🏆 Driver Standings", "🏎️ Constructor Standings", "🏁 Race Results"])
+tab1, tab2, tab3, tab4 = st.tabs(["🏆 Driver Standings", "🏎️ Constructor Standings", "🏁 Race Results", "👤 Driver Career"])
 
 with tab1:
     st.subheader(f"Driver Championship - {selected_year}")
-    with st.spinner("Fetching driver standings..."):
-        driver_standings = get_driver_standings_history(selected_year)
+    driver_standings = overview['driver_standings']
     
     if not driver_standings.empty:
         render_season_progress(driver_standings)
@@ -33,8 +41,7 @@ with tab1:
 
 with tab2:
     st.subheader(f"Constructor Championship - {selected_year}")
-    with st.spinner("Fetching constructor standings..."):
-        const_standings = get_constructor_standings_history(selected_year)
+    const_standings = overview['constructor_standings']
         
     if not const_standings.empty:
         render_constructor_progress(const_standings)
@@ -46,8 +53,7 @@ with tab2:
 
 with tab3:
     st.subheader(f"Race Results - {selected_year}")
-    with st.spinner("Fetching race calendar..."):
-        races = get_season_races(selected_year)
+    races = overview['races']
         
     if not races.empty:
         col1, col2 = st.columns([2, 1])
@@ -70,5 +76,55 @@ with tab3:
             )
         with col2:
             render_race_winners(races)
+
+        with st.expander("Race Classification"):
+            race_names = dict(zip(races['RaceName'], races['Round']))
+            race_name = st.selectbox("Race", list(race_names))
+            classification = get_race_results(selected_year, int(race_names[race_name]))
+            if not classification.empty:
+                st.dataframe(classification, hide_index=True, use_container_width=True)
+            else:
+                st.info("No classification available for this race.")
     else:
         st.warning("No races found for this year.")
+
+with tab4:
+    st.subheader("Driver Career")
+    driver_standings = overview['driver_standings']
+
+    if not driver_standings.empty and 'DriverId' in driver_standings.columns:
+        drivers = dict(zip(driver_standings['Name'], driver_standings['DriverId']))
+        driver_name = st.selectbox(f"Driver (from the {selected_year} grid)", list(drivers))
+        driver_id = drivers[driver_name]
+
+        # Streamlit runs every tab, and a career can take several requests, so only load it when asked
+        if st.checkbox("Load career stats", key=f"load_career_{selected_year}"):
+            with st.spinner(f"Loading career of {driver_name}..."):
+                career = get_driver_career_stats(driver_id)
+                positions = get_driver_position_distribution(driver_id)
+
+            if not career.empty:
+                c1, c2, c3, c4 = st.columns(4)
+                c1.metric("Starts", int(career['Starts'].sum()))
+                c2.metric("Wins", int(career['Wins'].sum()))
+                c3.metric("Podiums", int(career['Podiums'].sum()))
+                c4.metric("Points", f"{career['Points'].sum():g}")
+
+                col1, col2 = st.columns([2, 1])
+                with col1:
+                    render_career_seasons(career, driver_name)
+                with col2:
+                    render_position_distribution(positions)
+
+                with st.expander("View Raw Data"):
+                    st.dataframe(career, hide_index=True, use_container_width=True)
+            else:
+                st.warning(f"No career data found for {driver_name}.")
+    else:
+        st.warning("No drivers found for this year.")
+
+# Warm the caches for the seasons the user is likely to open next.
+# Batches are per browser session, so users don't cancel each other's prefetch.
+if 'prefetch_owner' not in st.session_state:
+    st.session_state['prefetch_owner'] = uuid.uuid4().hex
+prefetch_historical(selected_year, owner=st.session_state['prefetch_owner'])
@@ -0,0 +1,125 @@
+import copy
+import json
+import os
+from urllib.parse import urlsplit, parse_qs
+
+import pytest
+
+from backend import historical_data, historical_store
+from backend.caching import clear_cache
+from backend.ingest_history import ingest_season
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "ergast_2021.json")
+
+
+class FakeErgast:
+    """
+    Answers fetch_json from the fixture payloads, Ergast style, and records
+    every URL requested. Driver results are paged with limit/offset.
+    """
+    def __init__(self):
+        with open(FIXTURE, encoding="utf-8") as f:
+            self.payloads = json.load(f)
+        self.requests = []
+
+    def __call__(self, url, **kwargs):
+        self.requests.append(url)
+        parts = urlsplit(url)
+        path = parts.path[len(urlsplit(historical_data.ERGAST_API_URL).path):].strip("/").split("/")
+
+        if path[0] == "drivers":
+            query = parse_qs(parts.query)
+            limit, offset = int(query["limit"][0]), int(query["offset"][0])
+            races = self.payloads["driverResults"][path[1]]
+            return {"MRData": {
+                "limit": str(limit), "offset": str(offset), "total": str(len(races)),
+                "RaceTable": {"Races": copy.deepcopy(races[offset:offset + limit])}
+            }}
+
+        endpoint = {
+            "driverStandings.json": "driverStandings",
+            "constructorStandings.json": "constructorStandings",
+            "1.json": "winners",
+        }[path[-1]]
+        return copy.deepcopy(self.payloads[endpoint])
+
+
+@pytest.fixture
+def ergast(tmp_path, monkeypatch):
+    monkeypatch.setattr(historical_store, "HISTORY_DB_PATH", str(tmp_path / "history.sqlite"))
+    fake = FakeErgast()
+    monkeypatch.setattr(historical_data, "fetch_json", fake)
+    clear_cache()
+    yield fake
+    clear_cache()
+
+
+def test_ingested_season_is_served_from_the_store(ergast):
+    assert ingest_season(2021) == 3
+
+    ergast.requests.clear()
+    overview = historical_data.get_season_overview(2021)
+    assert ergast.requests == []
+
+    drivers = overview['driver_standings']
+    assert drivers['Driver'].tolist() == ['HAM', 'VER', 'FIT']
+    assert drivers['Position'].tolist() == [1, 2, 0]
+    assert drivers['Points'].tolist() == [43.0, 44.0, 0.0]
+    assert overview['constructor_standings']['Constructor'].tolist() == ['Mercedes', 'Red Bull']
+
+    races = overview['races']
+    assert races['Round'].tolist() == [1, 2]
+    assert races['Winner'].tolist() == ['HAM', 'VER']
+    assert races['Time'].tolist() == ['1:32:03.897', 'N/A']
+
+
+def test_finished_seasons_are_skipped_and_refetches_replace_rows(ergast):
+    assert ingest_season(2021) == 3
+
+    # Stored after the season ended: nothing to fetch
+    ergast.requests.clear()
+    assert ingest_season(2021) == 0
+    assert ergast.requests == []
+
+    # Stored while the season was running: fetched again, rows replaced rather than appended
+    ergast.payloads['driverStandings']['MRData']['StandingsTable']['StandingsLists'][0]['DriverStandings'][0]['points'] = '50'
+    conn = historical_store._connect()
+    with conn:
+        conn.execute('UPDATE ingested SET fetched_at = ?', (historical_data.season_end(2021) - 1,))
+    assert ingest_season(2021) == 3
+
+    drivers = historical_store.load_season('driver_standings', 2021)
+    assert len(drivers) == 3
+    assert drivers['Points'].tolist()[0] == 50
+    assert historical_store.ingested_at('driver_standings', 2021) >= historical_data.season_end(2021)
+
+    # Forced ingests refetch regardless
+    assert ingest_season(2021, force=True) == 3
+    assert len(historical_store.load_season('races', 2021)) == 2
+
+
+def test_driver_results_are_paged_and_resumed(ergast, monkeypatch):
+    monkeypatch.setattr(historical_data, "RESULTS_PAGE_SIZE", 2)
+    results = ergast.payloads['driverResults']['hamilton']
+    new_race = results.pop()
+
+    assert historical_data.update_driver_career('hamilton') == 4
+    assert [parse_qs(urlsplit(u).query)['offset'] for u in ergast.requests] == [['0'], ['2']]
+
+    # Only races after the stored ones are fetched
+    results.append(new_race)
+    clear_cache()
+    ergast.requests.clear()
+    stats = historical_data.get_driver_career_stats('hamilton')
+    assert [parse_qs(urlsplit(u).query)['offset'] for u in ergast.requests] == [['4']]
+    assert historical_store.count_driver_results('hamilton') == 5
+
+    assert stats['Season'].tolist() == [2020, 2021]
+    assert stats['Starts'].tolist() == [2, 3]
+    assert stats['Wins'].tolist() == [0, 1]
+    assert stats['Podiums'].tolist() == [2, 2]
+    assert stats['Points'].tolist() == [33.0, 43.0]
+
+    distribution = historical_data.get_driver_position_distribution('hamilton')
+    assert distribution['Finish'].tolist() == ['1', '2', '3', 'DNF']
+    assert distribution['Count'].tolist() == [1, 2, 1, 1]